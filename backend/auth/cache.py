@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Any, Optional
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from config import settings
+from models.user import User
+
+
+class TTLCache:
+    """
+    Caché en memoria (por worker) indexada por user_id
+
+    Cada entrada caduca a los `ttl_seconds` y, al alcanzar el tamaño máximo,
+    se expulsa la usada hace más tiempo (LRU).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[int, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int) -> Optional[Any]:
+        """Devuelve el valor cacheado o None si no está o caducó"""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, user_id: int, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Identidad del usuario autenticado (columnas de User) para get_current_user
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+# Perfil ya montado (UserResponse con cuentas sociales) para /auth/me y compañía
+profile_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+
+def cache_user(user: User) -> None:
+    """Guarda una copia de las columnas del usuario"""
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    user_cache.set(user.id, values)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Elimina al usuario de todas las cachés (llamar tras cualquier escritura sobre él)"""
+    user_cache.invalidate(user_id)
+    profile_cache.invalidate(user_id)
+
+
+async def attach_cached_user(db: AsyncSession, values: dict) -> User:
+    """
+    Reconstruye el usuario cacheado y lo asocia a la sesión sin consultar la BD
+
+    El objeto queda persistente en la sesión, así que los handlers pueden
+    modificarlo o refrescar sus relaciones igual que si viniera de una query.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
@@ -0,0 +1,90 @@
+"""
+Calibración del coste de bcrypt para esta máquina.
+
+Mide cuánto tarda una verificación con cada coste y recomienda el más alto
+cuya mediana no supera la latencia objetivo. Cada punto de coste duplica el
+trabajo: subirlo uno hace el doble de caro un ataque de diccionario, pero
+también cada login, así que el throughput de logins por worker se reduce a
+la mitad. La tabla muestra ese intercambio para decidirlo a conciencia.
+
+    python -m auth.calibrate                  # objetivo por defecto: 250 ms
+    python -m auth.calibrate --target-ms 100 --min-rounds 10 --max-rounds 14
+
+El resultado se aplica con BCRYPT_ROUNDS=<coste> en el .env; los hashes
+existentes se actualizan solos en el siguiente login correcto de cada usuario.
+Conviene ejecutarlo en la misma máquina (o tipo de instancia) que producción.
+"""
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+from auth.utils import HASH_POOL_WORKERS, hash_password, verify_password
+from config import settings
+
+SAMPLE_PASSWORD = "calibration-password"
+# bcrypt admite costes entre 4 y 31; por debajo de 10 no es seguro
+MIN_SAFE_ROUNDS = 10
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Mediana en segundos de verificar una contraseña con el coste dado"""
+    hashed = hash_password(SAMPLE_PASSWORD, rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        verify_password(SAMPLE_PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, min_rounds: int, max_rounds: int, samples: int) -> tuple[int, dict]:
+    """
+    Mide los costes de min_rounds en adelante y elige el recomendado
+
+    Se deja de medir en cuanto un coste supera el doble del objetivo: los
+    siguientes solo pueden ser más lentos.
+
+    Returns:
+        (coste recomendado, segundos por verificación de cada coste medido)
+    """
+    results = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        seconds = measure(rounds, samples)
+        results[rounds] = seconds
+        if seconds * 1000 <= target_ms:
+            chosen = rounds
+        if seconds * 1000 > target_ms * 2:
+            break
+    return chosen, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250, help="Latencia máxima de bcrypt por login")
+    parser.add_argument("--min-rounds", type=int, default=MIN_SAFE_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5, help="Verificaciones por coste")
+    args = parser.parse_args()
+
+    if not 4 <= args.min_rounds <= args.max_rounds <= 31:
+        parser.error("Los costes deben estar entre 4 y 31 y min-rounds <= max-rounds")
+
+    print(f"bcrypt {bcrypt.__version__}, {HASH_POOL_WORKERS} hilos de hashing por worker")
+    print(f"Coste actual: BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}\n")
+    print(f"{'coste':>6} {'ms/login':>10} {'logins/s por worker':>21}")
+
+    chosen, results = calibrate(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+    for rounds, seconds in results.items():
+        marker = "  ← recomendado" if rounds == chosen else ""
+        print(f"{rounds:>6} {seconds * 1000:>10.1f} {HASH_POOL_WORKERS / seconds:>21.1f}{marker}")
+
+    if results[chosen] * 1000 > args.target_ms:
+        print(f"\nNingún coste desde {args.min_rounds} cumple {args.target_ms:g} ms en esta máquina")
+    print(f"\nBCRYPT_ROUNDS={chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,128 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
 
+from auth.cache import attach_cached_user, cache_user, user_cache
+from auth.revocation import revocations
 from auth.utils import verify_token
 from auth.schemas import TokenData
+from database import AsyncSessionLocal, WriteSessionLocal
 from models.user import User
 
 # Configuración del esquema de seguridad Bearer
 security = HTTPBearer()
 
 
-def get_db():
-    """Dependency para obtener la sesión de base de datos"""
-    from main import SessionLocal
+# Métodos que solo leen: en SQLite no necesitan el bloqueo de escritura
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
 
-    db = SessionLocal()
-    try:
+
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Dependency para obtener la sesión asíncrona de base de datos (de escritura salvo en GET)"""
+    session_factory = AsyncSessionLocal if request.method in READ_METHODS else WriteSessionLocal
+    async with session_factory() as db:
         yield db
-    finally:
-        db.close()
 
 
-async def get_current_user(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudo validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+) -> dict:
     """
-    Dependency que verifica el token JWT y devuelve el usuario actual
+    Dependency que verifica el access token y devuelve su payload (sin tocar la BD)
+
+    Los tokens revocados (logout) se descartan con el filtro en memoria de
+    auth/revocation.py.
 
     Args:
         credentials: Credenciales HTTP Bearer con el token JWT
-        db: Sesión de base de datos
 
     Returns:
-        Usuario actual si el token es válido
+        Payload del token si es válido
 
     Raises:
-        HTTPException: Si el token es inválido o el usuario no existe
+        HTTPException: Si el token es inválido, de otro tipo o está revocado
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    # Verificar y decodificar el token del header Authorization
+    payload = verify_token(credentials.credentials)
+    if payload is None or revocations.is_revoked(payload["jti"]):
+        raise _credentials_exception()
+
+    return payload
 
-    # Obtener el token del header Authorization
-    token = credentials.credentials
 
-    # Verificar y decodificar el token
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
+async def get_stream_payload(token: str = Query(..., description="Token de POST /sync/stream-token")) -> dict:
+    """
+    Dependency de GET /sync/stream: verifica el token corto de la query string
 
+    Raises:
+        HTTPException: Si el token es inválido o caducado, o si la sesión de la
+            que sale se ha cerrado (logout)
+    """
+    payload = verify_token(token, token_type="stream")
+    if payload is None or revocations.is_revoked(payload["sid"]):
+        raise _credentials_exception()
+
+    return payload
+
+
+async def get_current_user_id(payload: dict = Depends(get_token_payload)) -> int:
+    """
+    Dependency que verifica el token JWT y devuelve solo el user_id (sin tocar la BD)
+
+    Args:
+        payload: Payload del access token ya verificado
+
+    Returns:
+        user_id del token si es válido
+
+    Raises:
+        HTTPException: Si el token no lleva user_id
+    """
     # Extraer el user_id del payload
     user_id: Optional[int] = payload.get("user_id")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    # Buscar el usuario en la base de datos
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id
+
+
+async def get_current_user(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Dependency que verifica el token JWT y devuelve el usuario actual
+
+    Args:
+        user_id: user_id extraído del token JWT
+        db: Sesión de base de datos
+
+    Returns:
+        Usuario actual si el token es válido
+
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe
+    """
+    # Primero la caché del worker; si no está, buscar en la base de datos
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await attach_cached_user(db, cached)
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    cache_user(user)
 
     return user
@@ -0,0 +1,139 @@
+"""
+Cliente de Google OAuth con conexiones reutilizables y verificación local del id_token.
+
+- Un único httpx.AsyncClient por proceso (creado en el lifespan de la app) con
+  pool de conexiones keep-alive y timeouts, en lugar de abrir TCP + TLS en cada login.
+- El id_token que devuelve el intercambio del code se verifica localmente con las
+  claves públicas de Google (JWKS), que se cachean con TTL. Si llega un `kid`
+  desconocido se vuelven a descargar (rotación de claves). Así desaparece la
+  llamada al endpoint userinfo.
+
+Las URLs son configurables para poder probarlo contra un servidor OAuth local
+(ver benchmarks/oauth_stub.py).
+"""
+from typing import Optional
+import asyncio
+import time
+
+import httpx
+from jose import JWTError, jwt
+
+from config import settings
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+# Tiempo mínimo entre dos descargas de claves provocadas por un kid desconocido
+JWKS_MIN_REFRESH_SECONDS = 5
+
+
+class GoogleAuthError(Exception):
+    """Error al intercambiar el code o al verificar el id_token de Google"""
+
+
+class GoogleOAuthClient:
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._keys: dict[str, dict] = {}
+        self._keys_expire_at = 0.0
+        self._keys_fetched_at = 0.0
+        self._keys_lock = asyncio.Lock()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.GOOGLE_HTTP_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def exchange_code(self, code: str) -> dict:
+        """Intercambia el authorization code por los tokens de Google"""
+        try:
+            response = await self.http.post(
+                settings.GOOGLE_TOKEN_URL,
+                data={
+                    "code": code,
+                    "client_id": settings.GOOGLE_CLIENT_ID,
+                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                    "redirect_uri": "postmessage",
+                    "grant_type": "authorization_code",
+                },
+            )
+        except httpx.HTTPError as e:
+            raise GoogleAuthError("Error al obtener tokens de Google") from e
+
+        if response.status_code != 200:
+            raise GoogleAuthError("Error al obtener tokens de Google")
+        return response.json()
+
+    async def _signing_key(self, kid: str) -> Optional[dict]:
+        now = time.monotonic()
+        if now < self._keys_expire_at and kid in self._keys:
+            return self._keys[kid]
+
+        async with self._keys_lock:
+            now = time.monotonic()
+            expired = now >= self._keys_expire_at
+            # kid desconocido con claves vigentes: posible rotación, pero sin
+            # permitir que tokens inventados fuercen descargas continuas
+            rotated = kid not in self._keys and now - self._keys_fetched_at >= JWKS_MIN_REFRESH_SECONDS
+            if expired or rotated:
+                await self._refresh_keys()
+        return self._keys.get(kid)
+
+    async def _refresh_keys(self):
+        try:
+            response = await self.http.get(settings.GOOGLE_JWKS_URL)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise GoogleAuthError("No se pudieron obtener las claves de Google") from e
+
+        self._keys = {key["kid"]: key for key in response.json().get("keys", [])}
+        self._keys_fetched_at = time.monotonic()
+        self._keys_expire_at = self._keys_fetched_at + (_max_age(response) or settings.GOOGLE_JWKS_TTL_SECONDS)
+
+    async def verify_id_token(self, id_token: str, access_token: Optional[str] = None) -> dict:
+        """
+        Verifica firma, audiencia, emisor y caducidad del id_token
+
+        Returns:
+            Claims del token (sub, email, name, picture...)
+        """
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+        except JWTError as e:
+            raise GoogleAuthError("id_token de Google inválido") from e
+
+        key = await self._signing_key(kid) if kid else None
+        if key is None:
+            raise GoogleAuthError("id_token firmado con una clave desconocida")
+
+        try:
+            return jwt.decode(
+                id_token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=settings.GOOGLE_CLIENT_ID,
+                issuer=GOOGLE_ISSUERS,
+                access_token=access_token,
+            )
+        except JWTError as e:
+            raise GoogleAuthError("id_token de Google inválido") from e
+
+
+def _max_age(response: httpx.Response) -> int:
+    """max-age del Cache-Control de la respuesta de claves (0 si no hay)"""
+    for directive in response.headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return int(value)
+    return 0
+
+
+google_client = GoogleOAuthClient()
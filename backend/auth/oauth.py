@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
-import httpx
 
-from config import settings
-from auth.schemas import TokenResponse, UserResponse, SocialAccountResponse
-from auth.utils import create_access_token
+from auth.schemas import TokenResponse
 from auth.dependencies import get_db
+from auth.google import GoogleAuthError, google_client
+from auth.rate_limit import limit_by_ip
+from auth.cache import invalidate_user
+from auth.profile import cache_profile
+from auth.tokens import issue_tokens
 from models.user import User
 from models.social_account import SocialAccount
 
@@ -17,72 +21,56 @@ class GoogleAuthRequest(BaseModel):
     code: str
 
 
-@router.post("/google", response_model=TokenResponse)
-async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
+@router.post("/google", response_model=TokenResponse, dependencies=[Depends(limit_by_ip)])
+async def google_auth(request: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """
     Autentica usuario con Google OAuth.
     - Recibe el authorization code del frontend
-    - Intercambia por tokens con Google
+    - Intercambia por tokens con Google y verifica el id_token localmente
     - Crea usuario si no existe, o lo loguea si ya existe
     """
 
-    # 1. Intercambiar code por tokens con Google
-    token_url = "https://oauth2.googleapis.com/token"
-    token_data = {
-        "code": request.code,
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "redirect_uri": "postmessage",
-        "grant_type": "authorization_code",
-    }
-
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(token_url, data=token_data)
-
-        if token_response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Error al obtener tokens de Google",
-            )
-
-        tokens = token_response.json()
-        access_token = tokens.get("access_token")
-
-        # 2. Obtener info del usuario de Google
-        userinfo_response = await client.get(
-            "https://www.googleapis.com/oauth2/v3/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
+    # 1. Intercambiar code por tokens con Google y verificar el id_token en local
+    try:
+        tokens = await google_client.exchange_code(request.code)
+        google_user = await google_client.verify_id_token(
+            tokens.get("id_token", ""), tokens.get("access_token")
+        )
+    except GoogleAuthError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
 
-        if userinfo_response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Error al obtener información del usuario de Google",
-            )
-
-        google_user = userinfo_response.json()
-
+    # 2. Datos del usuario: vienen en los claims del id_token (sin llamar a userinfo)
     google_id = google_user.get("sub")
     email = google_user.get("email")
+    if not google_id or not email:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El id_token de Google no incluye el email",
+        )
     name = google_user.get("name", email.split("@")[0])
     picture = google_user.get("picture")
 
     # 3. Buscar si ya existe una cuenta social con este google_id
-    social_account = (
-        db.query(SocialAccount)
-        .filter(
+    result = await db.execute(
+        select(SocialAccount)
+        .options(joinedload(SocialAccount.user).joinedload(User.social_accounts))
+        .where(
             SocialAccount.provider == "google",
             SocialAccount.provider_user_id == google_id,
         )
-        .first()
     )
+    social_account = result.unique().scalars().first()
 
     if social_account:
         # Usuario existente - login
         user = social_account.user
     else:
         # 4. Buscar si existe un usuario con este email
-        user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
 
         if user:
             # Vincular cuenta de Google a usuario existente
@@ -99,7 +87,9 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
             base_username = email.split("@")[0].lower().replace(".", "_")
             username = base_username
             counter = 1
-            while db.query(User).filter(User.username == username).first():
+            while (
+                await db.execute(select(User.id).where(User.username == username))
+            ).first():
                 username = f"{base_username}{counter}"
                 counter += 1
 
@@ -111,7 +101,7 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
                 is_email_verified=True,  # Google ya verifico el email
             )
             db.add(user)
-            db.flush()  # Para obtener el user.id
+            await db.flush()  # Para obtener el user.id
 
             # Crear cuenta social
             social_account = SocialAccount(
@@ -122,35 +112,12 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
             )
             db.add(social_account)
 
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user, attribute_names=["social_accounts"])
+        invalidate_user(user.id)
 
-    # 5. Crear JWT token
-    jwt_token = create_access_token(data={"user_id": user.id, "email": user.email})
+    # 5. Access token y refresh token
+    tokens = await issue_tokens(db, user.id, user.email)
 
     # 6. Preparar respuesta
-    social_accounts = [
-        SocialAccountResponse(
-            id=sa.id,
-            provider=sa.provider,
-            provider_email=sa.provider_email,
-            created_at=sa.created_at,
-        )
-        for sa in user.social_accounts
-    ]
-
-    return TokenResponse(
-        access_token=jwt_token,
-        token_type="bearer",
-        user=UserResponse(
-            id=user.id,
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            avatar_url=user.avatar_url,
-            is_email_verified=user.is_email_verified,
-            has_password=user.has_password,
-            created_at=user.created_at,
-            social_accounts=social_accounts,
-        ),
-    )
+    return TokenResponse(**tokens, user=cache_profile(user))
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from auth.cache import profile_cache
+from auth.schemas import UserResponse, SocialAccountResponse
+from models.user import User
+
+
+def user_with_accounts_query():
+    """SELECT de usuarios con sus cuentas sociales en la misma consulta (LEFT JOIN)"""
+    return select(User).options(joinedload(User.social_accounts))
+
+
+def build_profile(user: User) -> UserResponse:
+    """Monta la respuesta de perfil (requiere social_accounts ya cargadas)"""
+    return UserResponse(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        avatar_url=user.avatar_url,
+        is_email_verified=user.is_email_verified,
+        has_password=user.has_password,
+        created_at=user.created_at,
+        social_accounts=[
+            SocialAccountResponse(
+                id=sa.id,
+                provider=sa.provider,
+                provider_email=sa.provider_email,
+                created_at=sa.created_at,
+            )
+            for sa in user.social_accounts
+        ],
+    )
+
+
+def cache_profile(user: User) -> UserResponse:
+    """Monta el perfil y lo deja en la caché de perfiles"""
+    profile = build_profile(user)
+    profile_cache.set(user.id, profile)
+    return profile
+
+
+async def load_profile(db: AsyncSession, user_id: int) -> Optional[UserResponse]:
+    """
+    Perfil del usuario: desde la caché o con una única consulta
+
+    Returns:
+        El perfil, o None si el usuario no existe
+    """
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    result = await db.execute(user_with_accounts_query().where(User.id == user_id))
+    user = result.unique().scalars().first()
+    if user is None:
+        return None
+    return cache_profile(user)
@@ -0,0 +1,169 @@
+"""
+Limitación de intentos en los endpoints de autenticación (token bucket).
+
+Cada clave (IP o nombre de usuario) tiene un cubo con `burst` fichas que se
+rellena a `per_minute` fichas por minuto; cada intento gasta una y, si no
+quedan, la petición se rechaza con 429 y Retry-After. Las comprobaciones son
+dependencias de FastAPI, así que se ejecutan antes del handler y por tanto
+antes de cualquier bcrypt.
+
+En /auth/login se limita por IP y por nombre de usuario: lo segundo frena el
+credential stuffing distribuido contra una misma cuenta. El intento se cobra
+antes de verificar y se devuelve si el login es correcto, así que el usuario
+legítimo no acumula penalización.
+
+Backends:
+- MemoryRateLimitBackend (por defecto): en memoria del worker, con un máximo
+  de claves y expulsión LRU. Con varios workers cada uno tiene sus cubos; para
+  aproximar el límite global se reparte entre RATE_LIMIT_WORKERS (por defecto
+  WEB_CONCURRENCY), asumiendo que el balanceo reparte las peticiones.
+- Cualquier clase que implemente RateLimitBackend (p. ej. sobre Redis) se
+  puede activar con RATE_LIMIT_BACKEND="paquete.modulo:Clase".
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+import importlib
+import time
+
+from fastapi import Depends, Request
+
+from auth.dependencies import get_current_user_id
+from auth.schemas import UserLogin
+from config import settings
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    burst: int          # Intentos seguidos permitidos
+    per_minute: float   # Ritmo de recarga
+
+    def __post_init__(self):
+        # Con ritmo 0 un cubo vacío no se rellenaría nunca: se rechaza al arrancar
+        if self.per_minute <= 0:
+            raise ValueError(
+                f"RATE_LIMIT_*_PER_MINUTE debe ser mayor que 0 (es {self.per_minute}); "
+                "para desactivar el límite usa RATE_LIMIT_ENABLED=false"
+            )
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class RateLimited(Exception):
+    """Se lanza cuando una clave se ha quedado sin fichas"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        """
+        Gasta una ficha del cubo de `key`
+
+        Returns:
+            0 si se permite, o los segundos que faltan para la siguiente ficha
+        """
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        """Devuelve el cubo a su estado inicial (lleno)"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, max_keys: int, shares: int = 1):
+        self.max_keys = max_keys
+        self.shares = max(1, shares)
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # clave → [fichas, último instante]
+        self.evictions = 0
+
+    def _local(self, limit: RateLimit) -> tuple[float, float]:
+        """Parte del límite que corresponde a este worker"""
+        return max(1.0, limit.burst / self.shares), limit.per_second / self.shares
+
+    async def hit(self, key: str, limit: RateLimit) -> float:
+        burst, rate = self._local(limit)
+        now = time.monotonic()
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            # Expulsar la clave usada hace más tiempo; para ella equivale a un cubo lleno
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    async def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+def _load_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND:
+        module_name, _, class_name = settings.RATE_LIMIT_BACKEND.partition(":")
+        return getattr(importlib.import_module(module_name), class_name)()
+    return MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS, settings.RATE_LIMIT_WORKERS)
+
+
+backend = _load_backend()
+
+IP_LIMIT = RateLimit(settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE)
+USERNAME_LIMIT = RateLimit(settings.RATE_LIMIT_USERNAME_BURST, settings.RATE_LIMIT_USERNAME_PER_MINUTE)
+
+# Peticiones rechazadas por tipo de clave (para /metrics)
+rejected = {"ip": 0, "username": 0}
+
+
+async def _enforce(kind: str, key: str, limit: RateLimit):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = await backend.hit(f"{kind}:{key}", limit)
+    if retry_after:
+        rejected[kind] += 1
+        raise RateLimited(retry_after)
+
+
+def _client_ip(request: Request) -> str:
+    # Detrás de un proxy, uvicorn --proxy-headers ya pone aquí la IP real
+    return request.client.host if request.client else "unknown"
+
+
+def _username_key(username: str) -> str:
+    return username.strip().lower()
+
+
+async def limit_by_ip(request: Request):
+    """Dependency: limita los intentos por IP (register, google...)"""
+    await _enforce("ip", _client_ip(request), IP_LIMIT)
+
+
+async def limit_login(request: Request, credentials: UserLogin):
+    """Dependency de /auth/login: limita por IP y por nombre de usuario"""
+    await _enforce("ip", _client_ip(request), IP_LIMIT)
+    await _enforce("username", _username_key(credentials.username), USERNAME_LIMIT)
+
+
+async def limit_set_password(request: Request, user_id: int = Depends(get_current_user_id)):
+    """Dependency de /auth/set-password: limita por IP y por usuario"""
+    await _enforce("ip", _client_ip(request), IP_LIMIT)
+    await _enforce("username", f"id:{user_id}", USERNAME_LIMIT)
+
+
+async def reset_login_limit(username: str):
+    """Devuelve las fichas gastadas por un usuario tras un login correcto"""
+    if settings.RATE_LIMIT_ENABLED:
+        await backend.reset(f"username:{_username_key(username)}")
@@ -0,0 +1,178 @@
+"""
+Revocación de access tokens sin consultar la BD en cada petición.
+
+Los access tokens duran ACCESS_TOKEN_EXPIRE_MINUTES, así que solo hay que
+recordar los revocados antes de tiempo (logout) hasta que caducan. Cada
+worker los guarda en memoria en dos estructuras:
+
+- Un filtro de Bloom: unos pocos bytes por jti y una comprobación O(1) sin
+  falsos negativos. La inmensa mayoría de tokens no están revocados y se
+  descartan aquí.
+- Un diccionario exacto jti → caducidad para confirmar los positivos del
+  filtro (su tasa de falsos positivos es REVOCATION_FILTER_FP_RATE).
+
+La fuente de verdad es la tabla revoked_tokens. Al arrancar se carga con una
+sola consulta (solo las filas sin caducar) y después cada worker lee cada
+REVOCATION_SYNC_SECONDS las filas nuevas, así que un logout hecho en otro
+worker tarda como mucho ese tiempo en aplicarse aquí.
+
+Los id se asignan al insertar pero las filas se ven al hacer commit, que puede
+llegar en otro orden: un id bajo puede aparecer después de uno más alto que ya
+se leyó. Por eso cada lectura repasa también los últimos SYNC_ID_WINDOW ids
+ya vistos; volver a añadir un jti conocido no hace nada.
+"""
+from datetime import datetime
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from sqlalchemy import delete, func, select
+
+from config import settings
+from database import AsyncSessionLocal
+from models.refresh_token import RefreshToken
+from models.revoked_token import RevokedToken
+
+logger = logging.getLogger("corely.revocation")
+
+PURGE_INTERVAL_SECONDS = 3600  # Borrado de filas caducadas en la BD
+SYNC_ID_WINDOW = 1000  # Ids ya vistos que se vuelven a leer en cada sync()
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray con doble hashing (blake2b)"""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationList:
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self._bloom = BloomFilter(capacity, fp_rate)
+        self._revoked: dict[str, datetime] = {}  # jti → caducidad del token
+        self.last_id = 0
+        self.checks = 0
+        self.bloom_positives = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        if jti in self._revoked:
+            return
+        if len(self._revoked) >= self.capacity:
+            self._rebuild()
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+        self.bloom_positives += 1
+        if jti in self._revoked:
+            return True
+        self.false_positives += 1
+        return False
+
+    def _rebuild(self) -> None:
+        """Descarta los jti ya caducados y rehace el filtro (un Bloom no admite borrados)"""
+        now = datetime.utcnow()
+        self._reset({jti: exp for jti, exp in self._revoked.items() if exp > now})
+        self.rebuilds += 1
+
+    def _reset(self, revoked: dict[str, datetime]) -> None:
+        # Si no caben en la capacidad configurada, el filtro se dimensiona al doble
+        self._revoked = revoked
+        self.capacity = max(self.capacity, 2 * len(revoked))
+        self._bloom = BloomFilter(self.capacity, self.fp_rate)
+        for jti in revoked:
+            self._bloom.add(jti)
+
+    async def load(self) -> None:
+        """Carga desde cero los tokens revocados que aún no han caducado"""
+        async with AsyncSessionLocal() as db:
+            # Primero el último id: lo que se inserte después lo recogerá sync()
+            last_id = await db.scalar(select(func.max(RevokedToken.id))) or 0
+            rows = (await db.execute(
+                select(RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.id <= last_id, RevokedToken.expires_at > datetime.utcnow())
+            )).all()
+        self.last_id = last_id
+        self._reset(dict(rows))
+
+    async def sync(self) -> int:
+        """Añade las revocaciones hechas desde la última lectura (p. ej. en otros workers)"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(
+                    RevokedToken.id > self.last_id - SYNC_ID_WINDOW,
+                    RevokedToken.expires_at > datetime.utcnow(),
+                )
+            )).all()
+        for row_id, jti, expires_at in rows:
+            self.add(jti, expires_at)
+            self.last_id = max(self.last_id, row_id)
+        return len(rows)
+
+    async def run(self) -> None:
+        """Bucle de fondo: sincroniza periódicamente y purga lo caducado"""
+        last_purge = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+            try:
+                await self.sync()
+                if time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                    last_purge = time.monotonic()
+                    await purge_expired()
+                    self._rebuild()
+            except Exception:
+                logger.exception("Error sincronizando los tokens revocados")
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "capacity": self.capacity,
+            "bloom_bytes": self._bloom.nbytes,
+            "bloom_hashes": self._bloom.hashes,
+            "checks": self.checks,
+            "bloom_positives": self.bloom_positives,
+            "false_positives": self.false_positives,
+            "rebuilds": self.rebuilds,
+        }
+
+
+async def purge_expired() -> None:
+    """Borra de la BD los tokens revocados y refresh tokens ya caducados"""
+    cutoff = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < cutoff))
+        await db.execute(delete(RefreshToken).where(RefreshToken.expires_at < cutoff))
+        await db.commit()
+
+
+revocations = RevocationList(settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_FP_RATE)
@@ -1,23 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.schemas import (
     UserCreate,
     UserLogin,
     UserResponse,
+    TokenPair,
     TokenResponse,
-    SocialAccountResponse,
+    RefreshRequest,
+    LogoutRequest,
     SetPasswordRequest,
 )
-from auth.utils import hash_password, verify_password, create_access_token
-from auth.dependencies import get_current_user, get_db
+from auth.utils import (
+    hash_password_async,
+    verify_password_async,
+    hash_pool_metrics,
+    needs_rehash,
+    HashingPoolBusy,
+)
+from auth.dependencies import get_current_user, get_current_user_id, get_db, get_token_payload
+from auth.cache import invalidate_user
+from auth.profile import cache_profile, load_profile, user_with_accounts_query
+from auth.rate_limit import limit_by_ip, limit_login, limit_set_password, reset_login_limit
+from auth.tokens import issue_tokens, revoke_session, rotate_refresh_token
+from database import AsyncSessionLocal
 from models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/register",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip)],
+)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Endpoint para registrar un nuevo usuario
 
@@ -32,7 +53,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         HTTPException 400: Si el email ya está registrado
     """
     # Verificar si el email ya existe
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -40,24 +62,29 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Verificar si el username ya existe
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
+    result = await db.execute(select(User).where(User.username == user_data.username))
+    existing_username = result.scalars().first()
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El nombre de usuario ya está en uso",
         )
 
+    # Cerrar la transacción de lectura antes de bcrypt: la conexión vuelve al
+    # pool (y SQLite suelta el bloqueo) mientras dura el hash
+    await db.commit()
+
     # Crear nuevo usuario con contraseña hasheada
     new_user = User(
         email=user_data.email,
         username=user_data.username,
         full_name=user_data.full_name,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return {
         "message": "Usuario creado exitosamente",
@@ -69,25 +96,37 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limit_login)])
+async def login(
+    credentials: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Endpoint para iniciar sesión
 
+    Si el hash guardado usa un coste distinto de BCRYPT_ROUNDS se rehace con la
+    contraseña recibida, después de enviar la respuesta.
+
     Args:
         credentials: Credenciales de login (email, password)
+        background_tasks: Tareas a ejecutar tras la respuesta
         db: Sesión de base de datos
 
     Returns:
-        Token JWT y datos del usuario
+        Access token, refresh token y datos del usuario
 
     Raises:
         HTTPException 401: Si las credenciales son inválidas
+        HTTPException 429: Demasiados intentos para la IP o el usuario
     """
     # Buscar usuario por username o email
-    user = db.query(User).filter(
-        (User.username == credentials.username) | (User.email == credentials.username)
-    ).first()
+    # Usuario y cuentas sociales en una sola consulta
+    result = await db.execute(
+        user_with_accounts_query()
+        .where((User.username == credentials.username) | (User.email == credentials.username))
+    )
+    user = result.unique().scalars().first()
 
     # Verificar que el usuario existe y tiene password
     if not user or not user.hashed_password:
@@ -97,93 +136,103 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Liberar la conexión durante bcrypt (los objetos siguen cargados: expire_on_commit=False)
+    await db.commit()
+
     # Verificar contraseña
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Crear token JWT
-    access_token = create_access_token(data={"user_id": user.id, "email": user.email})
+    # Login correcto: no penalizar al usuario por los intentos fallidos previos
+    await reset_login_limit(credentials.username)
+
+    if needs_rehash(user.hashed_password):
+        background_tasks.add_task(_rehash_password, user.id, user.hashed_password, credentials.password)
+
+    # Access token corto y refresh token registrado en la BD
+    tokens = await issue_tokens(db, user.id, user.email)
+
+    return TokenResponse(**tokens, user=cache_profile(user))
 
-    # Preparar social accounts para la respuesta
-    social_accounts = [
-        SocialAccountResponse(
-            id=sa.id,
-            provider=sa.provider,
-            provider_email=sa.provider_email,
-            created_at=sa.created_at,
+
+async def _rehash_password(user_id: int, old_hash: str, password: str):
+    """Guarda el hash con el coste actual, salvo que la contraseña haya cambiado entretanto"""
+    try:
+        new_hash = await hash_password_async(password)
+    except HashingPoolBusy:
+        return  # Con el pool saturado se deja para el siguiente login
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
         )
-        for sa in user.social_accounts
-    ]
-
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        user=UserResponse(
-            id=user.id,
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            avatar_url=user.avatar_url,
-            is_email_verified=user.is_email_verified,
-            has_password=user.has_password,
-            created_at=user.created_at,
-            social_accounts=social_accounts,
-        ),
-    )
+        await db.commit()
+    if result.rowcount:
+        hash_pool_metrics["rehashed"] += 1
+        invalidate_user(user_id)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Endpoint protegido que devuelve la información del usuario actual
 
     Args:
-        current_user: Usuario actual obtenido del token JWT
+        user_id: user_id obtenido del token JWT
+        db: Sesión de base de datos
 
     Returns:
-        Datos del usuario actual
+        Datos del usuario actual (caché de perfiles o una sola consulta)
     """
-    social_accounts = [
-        SocialAccountResponse(
-            id=sa.id,
-            provider=sa.provider,
-            provider_email=sa.provider_email,
-            created_at=sa.created_at,
+    profile = await load_profile(db, user_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        for sa in current_user.social_accounts
-    ]
-
-    return UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        username=current_user.username,
-        full_name=current_user.full_name,
-        avatar_url=current_user.avatar_url,
-        is_email_verified=current_user.is_email_verified,
-        has_password=current_user.has_password,
-        created_at=current_user.created_at,
-        social_accounts=social_accounts,
-    )
+    return profile
+
+
+@router.post("/refresh", response_model=TokenPair)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Cambia un refresh token por un access token nuevo y otro refresh token
+
+    El refresh token usado deja de valer; volver a presentarlo revoca la sesión.
+
+    Raises:
+        HTTPException 401: Refresh token inválido, caducado, revocado o reutilizado
+    """
+    return await rotate_refresh_token(db, request.refresh_token)
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    request: Optional[LogoutRequest] = None,
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Endpoint de logout (opcional)
-    En una implementación con JWT sin blacklist, el logout se maneja en el frontend
-    eliminando el token del localStorage
+    Cierra la sesión: el access token en uso deja de valer al momento y, si se
+    envía el refresh token, también toda su familia
     """
-    return {"message": "Logout exitoso. Elimina el token del cliente."}
+    await revoke_session(db, payload, request.refresh_token if request else None)
+    return {"message": "Logout exitoso"}
 
 
-@router.post("/set-password")
+@router.post("/set-password", dependencies=[Depends(limit_set_password)])
 async def set_password(
     request: SetPasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -196,7 +245,10 @@ async def set_password(
             detail="La contraseña debe tener al menos 6 caracteres",
         )
 
-    current_user.hashed_password = hash_password(request.password)
-    db.commit()
+    # Liberar la conexión durante bcrypt y guardar el hash después
+    await db.commit()
+    current_user.hashed_password = await hash_password_async(request.password)
+    await db.commit()
+    invalidate_user(current_user.id)
 
     return {"message": "Contraseña establecida exitosamente"}
@@ -44,13 +44,28 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
-# Schema para respuesta de login con token
-class TokenResponse(BaseModel):
+# Par de tokens: access token corto y refresh token para renovarlo
+class TokenPair(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
+    expires_in: int  # Segundos de vida del access token
+
+
+# Schema para respuesta de login con token
+class TokenResponse(TokenPair):
     user: UserResponse
 
 
+# Schema para renovar el access token (POST /auth/refresh) o cerrar la sesión
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 # Schema para el token payload
 class TokenData(BaseModel):
     user_id: Optional[int] = None
@@ -0,0 +1,124 @@
+"""
+Emisión, rotación y revocación de las sesiones (access + refresh token).
+
+- Login / Google: access token corto y un refresh token nuevo, que abre una
+  familia (family_id = jti del primer refresh token de la sesión).
+- POST /auth/refresh: el refresh token se marca como revocado y se emite otro
+  de la misma familia. Si se presenta uno ya rotado, alguien tiene una copia:
+  se revoca la familia entera y el usuario tiene que volver a entrar.
+- POST /auth/logout: revoca la familia del refresh token y el jti del access
+  token en uso (tabla revoked_tokens + filtro en memoria, ver auth/revocation.py).
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.revocation import revocations
+from auth.utils import create_access_token, create_refresh_token, verify_token
+from config import settings
+from models.refresh_token import RefreshToken
+from models.revoked_token import RevokedToken
+from models.user import User
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido o caducado",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def issue_tokens(db: AsyncSession, user_id: int, email: str, family_id: Optional[str] = None) -> dict:
+    """
+    Crea un access token y un refresh token (registrado en la BD) y hace commit
+
+    Returns:
+        Campos de TokenPair
+    """
+    jti = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, user_id=user_id, family_id=family_id or jti, expires_at=expires_at))
+    await db.commit()
+
+    return {
+        "access_token": create_access_token(data={"user_id": user_id, "email": email}),
+        "refresh_token": create_refresh_token(user_id, jti, expires_at),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+async def _revoke_family(db: AsyncSession, family_id: str, now: datetime):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> dict:
+    """
+    Cambia un refresh token válido por un par nuevo de la misma familia
+
+    Returns:
+        Campos de TokenPair
+
+    Raises:
+        HTTPException 401: Token inválido, caducado, revocado o reutilizado
+    """
+    payload = verify_token(refresh_token, token_type="refresh")
+    if payload is None:
+        raise _invalid_refresh_token()
+
+    # FOR UPDATE: dos rotaciones simultáneas del mismo token no pueden ganar las dos
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.jti == payload["jti"]).with_for_update()
+    )
+    stored = result.scalars().first()
+    now = datetime.utcnow()
+    if stored is None or stored.expires_at <= now:
+        raise _invalid_refresh_token()
+
+    if stored.revoked_at is not None:
+        # Reutilización de un token ya rotado: cerrar la sesión completa
+        await _revoke_family(db, stored.family_id, now)
+        await db.commit()
+        raise _invalid_refresh_token()
+
+    stored.revoked_at = now
+    email = await db.scalar(select(User.email).where(User.id == stored.user_id))
+    if email is None:
+        raise _invalid_refresh_token()
+    return await issue_tokens(db, stored.user_id, email, family_id=stored.family_id)
+
+
+async def revoke_session(db: AsyncSession, access_payload: dict, refresh_token: Optional[str] = None):
+    """Revoca el access token en uso y, si se envía, la familia de su refresh token"""
+    now = datetime.utcnow()
+    expires_at = datetime.utcfromtimestamp(access_payload["exp"])
+    jti = access_payload["jti"]
+
+    # Un logout repetido (p. ej. antes de que los demás workers sincronicen la
+    # revocación) encuentra el jti ya guardado: no es un error
+    try:
+        async with db.begin_nested():
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+    except IntegrityError:
+        pass
+
+    if refresh_token:
+        payload = verify_token(refresh_token, token_type="refresh")
+        # Solo las sesiones del propio usuario
+        if payload is not None and payload.get("user_id") == access_payload.get("user_id"):
+            family_id = await db.scalar(select(RefreshToken.family_id).where(RefreshToken.jti == payload["jti"]))
+            if family_id is not None:
+                await _revoke_family(db, family_id, now)
+
+    await db.commit()
+    revocations.add(jti, expires_at)
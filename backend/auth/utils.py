@@ -1,15 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
+import os
+import time
+import uuid
 from config import settings
 
 
-def hash_password(password: str) -> str:
-    """Hashea una contraseña usando bcrypt"""
+# Pool acotado para bcrypt: el hash libera el GIL, así que con hilos basta
+HASH_POOL_WORKERS = settings.HASH_POOL_WORKERS or os.cpu_count() or 1
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = 0
+
+# Métricas del pool (un solo event loop por worker, no hace falta lock)
+hash_pool_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "busy_seconds": 0.0,
+    "rehashed": 0,  # Hashes actualizados al coste configurado tras un login
+}
+
+
+class HashingPoolBusy(Exception):
+    """Se lanza cuando la cola del pool de hashing está llena"""
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hashea una contraseña usando bcrypt con el coste configurado (BCRYPT_ROUNDS)"""
     # Convertir password a bytes y generar hash
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -21,9 +45,76 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def hash_cost(hashed_password: str) -> Optional[int]:
+    """Coste de un hash bcrypt ("$2b$12$..." → 12), o None si no tiene ese formato"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True si el hash no usa el coste configurado (más bajo o más alto)"""
+    return hash_cost(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+def get_hash_pool_metrics() -> dict:
+    """Devuelve una copia de las métricas del pool de hashing"""
+    return {
+        **hash_pool_metrics,
+        "workers": HASH_POOL_WORKERS,
+        "queue_limit": settings.HASH_QUEUE_LIMIT,
+        "pending": _hash_pending,
+    }
+
+
+async def _run_in_hash_pool(func, *args):
+    """
+    Ejecuta una función de bcrypt en el pool sin bloquear el event loop
+
+    Raises:
+        HashingPoolBusy: Si ya hay demasiados trabajos en cola
+    """
+    global _hash_pending
+
+    if _hash_pending >= HASH_POOL_WORKERS + settings.HASH_QUEUE_LIMIT:
+        hash_pool_metrics["rejected"] += 1
+        raise HashingPoolBusy()
+
+    _hash_pending += 1
+    hash_pool_metrics["submitted"] += 1
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+
+    def release():
+        global _hash_pending
+        _hash_pending -= 1
+        hash_pool_metrics["completed"] += 1
+        hash_pool_metrics["busy_seconds"] += time.perf_counter() - start
+
+    # La plaza se libera cuando el hilo termina, no cuando deja de esperarse: si
+    # el cliente se desconecta la petición se cancela, pero bcrypt sigue en marcha.
+    # El callback llega desde el hilo del pool, así que se pasa al event loop
+    future = _hash_executor.submit(func, *args)
+    future.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """Versión asíncrona de hash_password (se ejecuta en el pool de hashing)"""
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versión asíncrona de verify_password (se ejecuta en el pool de hashing)"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
-    Crea un token JWT con los datos proporcionados
+    Crea un access token JWT con los datos proporcionados
+
+    Cada token lleva un `jti` único para poder revocarlo (ver auth/revocation.py).
 
     Args:
         data: Diccionario con los datos a incluir en el token (ej: user_id, email)
@@ -37,26 +128,56 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
+        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[dict]:
+def create_refresh_token(user_id: int, jti: str, expires_at: datetime) -> str:
+    """Crea el JWT de un refresh token ya registrado en la tabla refresh_tokens"""
+    to_encode = {"user_id": user_id, "jti": jti, "type": "refresh", "exp": expires_at}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_stream_token(access_payload: dict) -> str:
+    """
+    Crea el token corto con el que se abre GET /sync/stream
+
+    EventSource no puede enviar la cabecera Authorization, así que el token va
+    en la URL: caduca en SSE_TOKEN_EXPIRE_SECONDS y solo sirve para abrir el
+    canal. Lleva el jti (`sid`) y la caducidad (`sid_exp`) del access token del
+    que sale, para cerrar el canal cuando esa sesión se revoque o caduque.
+    """
+    to_encode = {
+        "user_id": access_payload["user_id"],
+        "sid": access_payload["jti"],
+        "sid_exp": access_payload["exp"],
+        "jti": uuid.uuid4().hex,
+        "type": "stream",
+        "exp": datetime.utcnow() + timedelta(seconds=settings.SSE_TOKEN_EXPIRE_SECONDS),
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     """
     Verifica y decodifica un token JWT
 
     Args:
         token: Token JWT a verificar
+        token_type: Tipo esperado ("access", "refresh" o "stream"); un token
+            de un tipo no sirve como otro
 
     Returns:
         Diccionario con los datos del token si es válido, None si no lo es
     """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    if payload.get("type") != token_type or not payload.get("jti"):
+        return None
+    return payload
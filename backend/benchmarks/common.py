@@ -0,0 +1,44 @@
+"""Utilidades compartidas por los benchmarks"""
+import math
+import statistics
+import uuid
+
+import httpx
+
+BENCH_PASSWORD = "bench_password"
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    """Registra un usuario desechable y devuelve su token JWT"""
+    name = f"bench_{uuid.uuid4().hex[:10]}"
+    await client.post(
+        "/auth/register",
+        json={
+            "email": f"{name}@example.com",
+            "username": name,
+            "full_name": name,
+            "password": BENCH_PASSWORD,
+        },
+    )
+    response = await client.post("/auth/login", json={"username": name, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentil por el método nearest-rank sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """p50/p95/p99 y media en milisegundos a partir de latencias en segundos"""
+    values = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.fmean(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
@@ -0,0 +1,66 @@
+"""
+Benchmark de throughput con peticiones concurrentes.
+
+Lanza N peticiones autenticadas a la vez contra un backend ya levantado y
+muestra peticiones/segundo y latencias. Sirve para comparar el antes y el
+después de un cambio (p. ej. sesiones síncronas vs AsyncSession):
+
+    python -m benchmarks.concurrency --url http://localhost:8000 --requests 500 --concurrency 50
+
+Para una carga mixta sobre todas las rutas, ver benchmarks/load.py.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import get_token, latency_summary
+
+
+async def run(url: str, path: str, total: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        token = await get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/tasks")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.path, args.requests, args.concurrency))
+    for key, value in result.items():
+        print(f"{key:>12}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""
+Prueba de carga sobre todas las rutas de auth, tasks y habits.
+
+Cada cliente virtual inicia sesión con un usuario sembrado por
+benchmarks/seed.py (seed0, seed1...) y lanza una mezcla ponderada de
+operaciones: listados con y sin filtros, altas, ediciones, borrados, lotes,
+búsqueda, resumen, toggles, historial, login, registro, refresh, logout y
+cambio de contraseña. Al final muestra por ruta el throughput, las latencias
+p50/p95/p99 y las consultas SQL por petición.
+
+Por defecto arranca la app en el propio proceso (ASGI, sin red) sobre la BD de
+DATABASE_URL, lo que permite contar las consultas de cada petición con los
+eventos del engine. Con --url ataca un backend ya levantado (las consultas no
+se pueden contar desde fuera).
+
+    # BD nueva con 200 usuarios sembrados y 5000 peticiones con 50 clientes
+    DATABASE_URL=sqlite:////tmp/bench.sqlite python -m benchmarks.load --seed-users 200 --requests 5000
+
+Hace falta un usuario sembrado por cliente: con --seed-users, --concurrency
+vale por defecto el mínimo entre 50 y los usuarios sembrados y no puede
+superarlos.
+
+    # Guardar la línea base / comparar una versión nueva con ella
+    python -m benchmarks.load ... --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load ... --compare benchmarks/baseline.json
+
+La comparación marca una ruta como regresión si su p95 empeora más de
+--tolerance (25% por defecto) o si hace más de un 10% más de consultas por
+petición que en la línea base, y en ese caso termina con código 1 (útil en CI).
+Las latencias solo son comparables en la misma máquina; las consultas por
+petición, en cualquiera.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import BENCH_PASSWORD, latency_summary
+
+# Aumento de consultas por petición admitido (las hay que dependen del estado, p. ej. el primer toggle del día)
+QUERY_TOLERANCE = 0.10
+DEFAULT_CONCURRENCY = 50
+
+# [consultas, segundos en BD] de la petición en curso (solo en modo in-process)
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    db_seconds: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+class Recorder:
+    def __init__(self, count_queries: bool):
+        self.count_queries = count_queries
+        self.routes: dict[str, RouteStats] = {}
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        counter = [0, 0.0]
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_queries.reset(token)
+
+        stats = self.routes.setdefault(name, RouteStats())
+        stats.latencies.append(elapsed)
+        if self.count_queries:
+            stats.queries.append(counter[0])
+            stats.db_seconds.append(counter[1])
+        if response.status_code >= 400:
+            stats.errors += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for name in sorted(self.routes):
+            stats = self.routes[name]
+            routes[name] = {
+                "requests": len(stats.latencies),
+                "errors": stats.errors,
+                "rps": round(len(stats.latencies) / elapsed, 1),
+                **latency_summary(stats.latencies),
+                "queries_per_request": _mean(stats.queries, 2) if self.count_queries else None,
+                "db_ms_per_request": _mean(stats.db_seconds, 5, scale=1000) if self.count_queries else None,
+            }
+
+        every = [lat for stats in self.routes.values() for lat in stats.latencies]
+        queries = [q for stats in self.routes.values() for q in stats.queries]
+        overall = {
+            "requests": len(every),
+            "errors": sum(stats.errors for stats in self.routes.values()),
+            "elapsed_s": round(elapsed, 2),
+            "rps": round(len(every) / elapsed, 1),
+            **latency_summary(every),
+            "queries_per_request": _mean(queries, 2) if self.count_queries else None,
+        }
+        return {"overall": overall, "routes": routes}
+
+
+def _mean(values: list, digits: int, scale: float = 1) -> Optional[float]:
+    return round(sum(values) * scale / len(values), digits) if values else None
+
+
+def _install_query_counter(engine):
+    """Cuenta las sentencias SQL y su duración en el contador de la petición en curso"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("bench_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["bench_start"].pop()
+        counter = _request_queries.get()
+        # BEGIN (IMMEDIATE en SQLite) no es una consulta de la petición
+        if counter is not None and not statement.lstrip().upper().startswith("BEGIN"):
+            counter[0] += 1
+            counter[1] += time.perf_counter() - start
+
+
+class VirtualUser:
+    """Un cliente que usa la app como lo haría el frontend"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, username: str, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.rng = rng
+        self.headers: dict = {}
+        self.refresh_token: Optional[str] = None
+        self.task_ids: list[int] = []
+        self.habit_ids: list[int] = []
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.recorder.request(self.client, name, method, url, headers=self.headers, **kwargs)
+
+    def _task_payload(self) -> dict:
+        due = datetime.utcnow() + timedelta(days=self.rng.randint(-10, 60))
+        return {
+            "name": f"load_{uuid.uuid4().hex[:12]}",
+            "priority": self.rng.choice(("low", "medium", "high")),
+            "status": "pending",
+            "due_date": due.isoformat(),
+        }
+
+    def _pop(self, ids: list[int]) -> Optional[int]:
+        return ids.pop(self.rng.randrange(len(ids))) if ids else None
+
+    # --- auth ---
+
+    async def login(self):
+        self.headers = {}
+        response = await self.call(
+            "POST /auth/login", "POST", "/auth/login",
+            json={"username": self.username, "password": BENCH_PASSWORD},
+        )
+        response.raise_for_status()
+        self._use_tokens(response.json())
+
+    def _use_tokens(self, tokens: dict):
+        self.headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        self.refresh_token = tokens["refresh_token"]
+
+    async def refresh(self):
+        response = await self.call(
+            "POST /auth/refresh", "POST", "/auth/refresh", json={"refresh_token": self.refresh_token},
+        )
+        if response.status_code == 200:
+            self._use_tokens(response.json())
+
+    async def me(self):
+        await self.call("GET /auth/me", "GET", "/auth/me")
+
+    async def register(self):
+        name = f"load_{uuid.uuid4().hex[:10]}"
+        await self.recorder.request(self.client, "POST /auth/register", "POST", "/auth/register", json={
+            "email": f"{name}@example.com", "username": name, "full_name": name, "password": BENCH_PASSWORD,
+        })
+
+    async def logout(self):
+        await self.call("POST /auth/logout", "POST", "/auth/logout", json={"refresh_token": self.refresh_token})
+        await self.login()
+
+    async def set_password(self):
+        await self.call("POST /auth/set-password", "POST", "/auth/set-password", json={"password": BENCH_PASSWORD})
+
+    # --- tasks ---
+
+    async def list_tasks(self):
+        response = await self.call("GET /tasks", "GET", "/tasks", params={"limit": 50})
+        if response.status_code == 200:
+            self.task_ids = [task["id"] for task in response.json()]
+
+    async def list_tasks_filtered(self):
+        await self.call(
+            "GET /tasks?filters", "GET", "/tasks",
+            params={"status": "pending", "priority": self.rng.choice(("low", "medium", "high")), "order": "desc", "limit": 20},
+        )
+
+    async def search_tasks(self):
+        # Palabras de los nombres sembrados por benchmarks/seed.py (t0, t1...) y de las descripciones
+        query = self.rng.choice(("prueba", "descripción", "descrip*", f"t{self.rng.randint(0, 50)}"))
+        await self.call("GET /tasks/search", "GET", "/tasks/search", params={"q": query, "limit": 20})
+
+    async def task_summary(self):
+        await self.call("GET /tasks/summary", "GET", "/tasks/summary")
+
+    async def create_task(self):
+        response = await self.call("POST /tasks", "POST", "/tasks", json=self._task_payload())
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+
+    async def update_task(self):
+        if self.task_ids:
+            task_id = self.rng.choice(self.task_ids)
+            status = self.rng.choice(("pending", "completed"))
+            await self.call("PUT /tasks/{id}", "PUT", f"/tasks/{task_id}", json={"status": status})
+
+    async def delete_task(self):
+        task_id = self._pop(self.task_ids)
+        if task_id is not None:
+            await self.call("DELETE /tasks/{id}", "DELETE", f"/tasks/{task_id}")
+
+    async def batch_create_tasks(self):
+        response = await self.call(
+            "POST /tasks/batch", "POST", "/tasks/batch", json=[self._task_payload() for _ in range(10)]
+        )
+        if response.status_code == 200:
+            self.task_ids += [item["id"] for item in response.json() if item["result"] == "created"]
+
+    async def batch_update_tasks(self):
+        ids = self.rng.sample(self.task_ids, min(10, len(self.task_ids)))
+        if ids:
+            await self.call(
+                "PATCH /tasks/batch", "PATCH", "/tasks/batch",
+                json=[{"id": task_id, "priority": self.rng.choice(("low", "medium", "high"))} for task_id in ids],
+            )
+
+    async def batch_delete_tasks(self):
+        ids = [self._pop(self.task_ids) for _ in range(min(5, len(self.task_ids)))]
+        if ids:
+            await self.call("DELETE /tasks/batch", "DELETE", "/tasks/batch", json={"ids": ids})
+
+    # --- habits ---
+
+    async def list_habits(self):
+        response = await self.call("GET /habits", "GET", "/habits")
+        if response.status_code == 200:
+            self.habit_ids = [habit["id"] for habit in response.json()]
+
+    async def habit_stats(self):
+        await self.call("GET /habits/stats", "GET", "/habits/stats")
+
+    async def create_habit(self):
+        response = await self.call(
+            "POST /habits", "POST", "/habits",
+            json={"name": f"load_{uuid.uuid4().hex[:12]}", "goal": 30},
+        )
+        if response.status_code == 201:
+            self.habit_ids.append(response.json()["id"])
+
+    async def update_habit(self):
+        if self.habit_ids:
+            habit_id = self.rng.choice(self.habit_ids)
+            await self.call("PUT /habits/{id}", "PUT", f"/habits/{habit_id}", json={"goal": self.rng.choice((21, 30, 60))})
+
+    async def delete_habit(self):
+        # Conserva al menos un par de hábitos para que los toggles tengan sobre qué actuar
+        if len(self.habit_ids) > 2:
+            habit_id = self._pop(self.habit_ids)
+            await self.call("DELETE /habits/{id}", "DELETE", f"/habits/{habit_id}")
+
+    async def toggle_habit(self):
+        if self.habit_ids:
+            habit_id = self.rng.choice(self.habit_ids)
+            await self.call("POST /habits/{id}/toggle", "POST", f"/habits/{habit_id}/toggle")
+
+    async def habit_history(self):
+        if self.habit_ids:
+            habit_id = self.rng.choice(self.habit_ids)
+            await self.call("GET /habits/{id}/history", "GET", f"/habits/{habit_id}/history")
+
+
+# Peso relativo de cada operación (aprox. el uso real: mucha lectura, toggles y poco auth)
+MIX = {
+    VirtualUser.me: 5,
+    VirtualUser.login: 1,
+    VirtualUser.register: 0.5,
+    VirtualUser.refresh: 1,
+    VirtualUser.logout: 0.5,
+    VirtualUser.set_password: 0.2,
+    VirtualUser.list_tasks: 10,
+    VirtualUser.list_tasks_filtered: 3,
+    VirtualUser.search_tasks: 2,
+    VirtualUser.task_summary: 3,
+    VirtualUser.create_task: 3,
+    VirtualUser.update_task: 3,
+    VirtualUser.delete_task: 1,
+    VirtualUser.batch_create_tasks: 0.5,
+    VirtualUser.batch_update_tasks: 0.5,
+    VirtualUser.batch_delete_tasks: 0.5,
+    VirtualUser.list_habits: 8,
+    VirtualUser.habit_stats: 4,
+    VirtualUser.create_habit: 1,
+    VirtualUser.update_habit: 1,
+    VirtualUser.delete_habit: 0.5,
+    VirtualUser.toggle_habit: 5,
+    VirtualUser.habit_history: 2,
+}
+
+
+@asynccontextmanager
+async def _client(url: Optional[str]):
+    """Cliente HTTP contra el backend remoto o contra la app en el propio proceso"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            yield client
+        return
+
+    from database import engine
+    from main import app
+
+    _install_query_counter(engine)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+async def run(url: Optional[str], total: int, concurrency: int, prefix: str, seed_value: int) -> dict:
+    recorder = Recorder(count_queries=url is None)
+    operations = list(MIX)
+    weights = list(MIX.values())
+    remaining = total
+
+    async with _client(url) as client:
+        users = [
+            VirtualUser(client, recorder, f"{prefix}{i}", random.Random(seed_value + i))
+            for i in range(concurrency)
+        ]
+        # Sesión inicial y datos de cada cliente (no cuenta para las métricas)
+        await asyncio.gather(*(user.login() for user in users))
+        await asyncio.gather(*(user.list_tasks() for user in users))
+        await asyncio.gather(*(user.list_habits() for user in users))
+        recorder.routes.clear()
+
+        async def worker(user: VirtualUser):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                operation = user.rng.choices(operations, weights)[0]
+                await operation(user)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(user) for user in users))
+        elapsed = time.perf_counter() - start
+
+    meta = {
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "target": url or "in-process",
+        "requests": total,
+        "concurrency": concurrency,
+        "seed": seed_value,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    if url is None:
+        from database import engine
+
+        meta["database"] = engine.dialect.name
+    return {"meta": meta, **recorder.report(elapsed)}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Rutas que han empeorado respecto a la línea base"""
+    regressions = []
+    for name, current in report["routes"].items():
+        previous = baseline["routes"].get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} → {current['p95_ms']} ms")
+        if (
+            current["queries_per_request"] is not None
+            and previous.get("queries_per_request") is not None
+            and current["queries_per_request"] > previous["queries_per_request"] * (1 + QUERY_TOLERANCE)
+        ):
+            regressions.append(
+                f"{name}: consultas/petición {previous['queries_per_request']} → {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def _print_report(report: dict, baseline: Optional[dict]):
+    header = f"{'ruta':<26}{'n':>7}{'err':>5}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>7}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["overall"])]
+    baseline_rows = {**baseline["routes"], "TOTAL": baseline["overall"]} if baseline else {}
+    for name, stats in rows:
+        queries = stats["queries_per_request"]
+        line = (
+            f"{name:<26}{stats['requests']:>7}{stats['errors']:>5}{stats['rps']:>8}"
+            f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+            f"{queries if queries is not None else '-':>7}"
+        )
+        previous = baseline_rows.get(name)
+        if previous:
+            line += f"   (base p95 {previous['p95_ms']}, q/req {previous.get('queries_per_request')})"
+        print(line)
+
+
+def main():
+    # Todos los clientes in-process comparten IP: sin esto los logins acabarían en 429.
+    # Contra un backend remoto hay que arrancarlo con RATE_LIMIT_ENABLED=false.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Backend ya levantado (por defecto, la app en el propio proceso)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument(
+        "--concurrency", type=int, help=f"Clientes virtuales, uno por usuario sembrado (por defecto {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument("--prefix", default="seed", help="Prefijo de los usuarios sembrados")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de la mezcla de operaciones")
+    parser.add_argument("--seed-users", type=int, default=0, help="Sembrar antes N usuarios (solo in-process)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Guardar el resultado como línea base")
+    parser.add_argument("--compare", metavar="PATH", help="Comparar con una línea base guardada")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento de p95 admitido")
+    args = parser.parse_args()
+
+    if args.concurrency is None:
+        args.concurrency = min(DEFAULT_CONCURRENCY, args.seed_users) if args.seed_users else DEFAULT_CONCURRENCY
+    elif args.seed_users and args.concurrency > args.seed_users:
+        parser.error(
+            f"--concurrency {args.concurrency} necesita al menos {args.concurrency} usuarios sembrados "
+            f"(--seed-users {args.seed_users}): cada cliente inicia sesión con el suyo"
+        )
+
+    if args.seed_users:
+        from benchmarks.seed import _run as run_seed
+
+        seeded = asyncio.run(run_seed({"users": args.seed_users, "prefix": args.prefix}))
+        print("Sembrado: " + ", ".join(f"{key}={value}" for key, value in seeded.items()) + "\n")
+
+    report = asyncio.run(run(args.url, args.requests, args.concurrency, args.prefix, args.seed))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    _print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nLínea base guardada en {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegresiones respecto a la línea base:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nSin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Servidor OAuth local que imita a Google para probar /auth/google sin red.
+
+Expone /token (intercambio de code) y /certs (JWKS). El code que se envía
+decide el usuario: `code=ana` devuelve un id_token con sub "stub-ana" y email
+ana@example.com. POST /rotate genera una clave nueva para probar la rotación.
+
+    python -m benchmarks.oauth_stub serve --port 9000
+
+    # en otra terminal, el backend apuntando al stub
+    GOOGLE_CLIENT_ID=stub-client \\
+    GOOGLE_TOKEN_URL=http://localhost:9000/token \\
+    GOOGLE_JWKS_URL=http://localhost:9000/certs \\
+    uvicorn main:app
+
+    # y N logins concurrentes contra el backend
+    python -m benchmarks.oauth_stub login --url http://localhost:8000 --logins 200
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import statistics
+import time
+import uuid
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Form, HTTPException
+from fastapi.responses import JSONResponse
+from jose import jwt
+
+CLIENT_ID = "stub-client"
+ISSUER = "https://accounts.google.com"
+
+
+def _b64(number: int) -> str:
+    raw = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class StubKeys:
+    def __init__(self):
+        self.keys: list[tuple[str, rsa.RSAPrivateKey]] = []
+        self.rotate()
+
+    def rotate(self) -> str:
+        """Añade una clave nueva (la que firma) y conserva la anterior, como Google"""
+        kid = uuid.uuid4().hex[:16]
+        self.keys = [(kid, rsa.generate_private_key(public_exponent=65537, key_size=2048))] + self.keys[:1]
+        return kid
+
+    def sign(self, claims: dict, access_token: str) -> str:
+        kid, key = self.keys[0]
+        pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        # at_hash: mitad izquierda del SHA-256 del access_token
+        digest = hashlib.sha256(access_token.encode()).digest()
+        claims["at_hash"] = base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+        return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, key in self.keys:
+            numbers = key.public_key().public_numbers()
+            keys.append({
+                "kid": kid, "kty": "RSA", "alg": "RS256", "use": "sig",
+                "n": _b64(numbers.n), "e": _b64(numbers.e),
+            })
+        return {"keys": keys}
+
+
+def create_app(client_id: str = CLIENT_ID, max_age: int = 3600) -> FastAPI:
+    app = FastAPI(title="Stub OAuth")
+    keys = StubKeys()
+    app.state.jwks_requests = 0
+
+    @app.post("/token")
+    async def token(code: str = Form(...), client_id_form: str = Form(None, alias="client_id")):
+        if client_id_form != client_id or code == "invalid":
+            raise HTTPException(status_code=400, detail="invalid_grant")
+
+        now = int(time.time())
+        access_token = uuid.uuid4().hex
+        claims = {
+            "iss": ISSUER,
+            "aud": client_id,
+            "sub": f"stub-{code}",
+            "email": f"{code}@example.com",
+            "email_verified": True,
+            "name": code.capitalize(),
+            "picture": None,
+            "iat": now,
+            "exp": now + 3600,
+        }
+        return {
+            "access_token": access_token,
+            "id_token": keys.sign(claims, access_token),
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+
+    @app.get("/certs")
+    async def certs():
+        app.state.jwks_requests += 1
+        return JSONResponse(keys.jwks(), headers={"Cache-Control": f"public, max-age={max_age}"})
+
+    @app.post("/rotate")
+    async def rotate():
+        return {"kid": keys.rotate()}
+
+    @app.get("/stats")
+    async def stats():
+        return {"jwks_requests": app.state.jwks_requests}
+
+    return app
+
+
+async def login(url: str, logins: int, users: int) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        latencies: list[float] = []
+        errors = 0
+
+        async def one(i: int):
+            nonlocal errors
+            start = time.perf_counter()
+            response = await client.post("/auth/google", json={"code": f"bench{i % users}"})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(logins)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "logins": logins,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "logins_per_s": round(logins / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Levanta el servidor OAuth falso")
+    serve.add_argument("--port", type=int, default=9000)
+    serve.add_argument("--client-id", default=CLIENT_ID)
+    serve.add_argument("--max-age", type=int, default=3600, help="max-age del JWKS")
+
+    bench = commands.add_parser("login", help="Lanza logins concurrentes contra el backend")
+    bench.add_argument("--url", default="http://localhost:8000")
+    bench.add_argument("--logins", type=int, default=200)
+    bench.add_argument("--users", type=int, default=20, help="Usuarios distintos")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        import uvicorn
+
+        uvicorn.run(create_app(args.client_id, args.max_age), port=args.port)
+    else:
+        report = asyncio.run(login(args.url, args.logins, args.users))
+        for key, value in report.items():
+            print(f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark de serialización de listados.
+
+Compara el coste por elemento de los dos caminos para N tareas:
+
+- orm: objetos Task del ORM → validación con TaskResponse (from_attributes)
+  → jsonable_encoder + json.dumps, que es lo que hace FastAPI con response_model.
+- fast: filas planas (dict) → orjson.dumps, el camino de fast_json.rows_response.
+
+    python -m benchmarks.serialization --items 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import Task
+from tasks.schemas import TaskResponse
+
+
+def _rows(items: int) -> list[dict]:
+    now = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    return [
+        {
+            "id": i,
+            "name": f"Tarea {i}",
+            "priority": "high" if i % 3 == 0 else "low",
+            "status": "pending",
+            "created_at": now,
+            "due_date": now + timedelta(hours=i),
+            "description": "Descripción de ejemplo para la tarea" if i % 2 else None,
+            "id_user": 1,
+        }
+        for i in range(items)
+    ]
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(items: int, repeat: int) -> dict:
+    rows = _rows(items)
+    orm_objects = [Task(**row) for row in rows]
+    adapter = TypeAdapter(list[TaskResponse])
+
+    def orm_path():
+        validated = adapter.validate_python(orm_objects, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def fast_path():
+        return orjson.dumps([dict(row) for row in rows])
+
+    assert json.loads(orm_path()) == json.loads(fast_path())
+
+    orm_s = _best_of(orm_path, repeat)
+    fast_s = _best_of(fast_path, repeat)
+    return {
+        "items": items,
+        "orm_total_ms": round(orm_s * 1000, 2),
+        "fast_total_ms": round(fast_s * 1000, 2),
+        "orm_per_item_us": round(orm_s / items * 1e6, 3),
+        "fast_per_item_us": round(fast_s / items * 1e6, 3),
+        "speedup": round(orm_s / fast_s, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in run(args.items, args.repeat).items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Prueba de carga del canal push (GET /sync/stream).
+
+Abre N conexiones SSE inactivas de un mismo usuario contra un backend
+levantado, provoca una escritura y mide cuánto tarda el evento en llegar a
+todas. Subiendo N se ve cuántas conexiones aguanta un worker (vigilar a la
+vez la memoria del proceso con `ps`/`docker stats`):
+
+    python -m benchmarks.sse_connections --url http://localhost:8000 --connections 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import get_token
+
+
+async def run(url: str, connections: int, timeout: float) -> dict:
+    limits = httpx.Limits(max_connections=connections + 10, max_keepalive_connections=connections + 10)
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+        token = await get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        connected = 0
+        all_connected = asyncio.Event()
+        received: list[float] = []
+        write_sent_at = 0.0
+
+        async def listener():
+            nonlocal connected
+            # Como EventSource: primero el token corto, luego el canal con ?token=
+            token_response = await client.post("/sync/stream-token", headers=headers)
+            stream_token = token_response.json()["stream_token"]
+            async with client.stream("GET", "/sync/stream", params={"token": stream_token}) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith(": connected"):
+                        connected += 1
+                        if connected == connections:
+                            all_connected.set()
+                    elif line.startswith("event: task.created"):
+                        received.append(time.perf_counter() - write_sent_at)
+                        return
+
+        open_start = time.perf_counter()
+        listeners = [asyncio.create_task(listener()) for _ in range(connections)]
+        try:
+            await asyncio.wait_for(all_connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        open_elapsed = time.perf_counter() - open_start
+
+        write_sent_at = time.perf_counter()
+        await client.post(
+            "/tasks",
+            json={
+                "name": f"sse_{uuid.uuid4().hex[:8]}",
+                "priority": "low",
+                "status": "pending",
+                "due_date": "2030-01-01T00:00:00",
+            },
+            headers=headers,
+        )
+        await asyncio.wait(listeners, timeout=timeout)
+        for task in listeners:
+            task.cancel()
+
+    received.sort()
+    return {
+        "connections_requested": connections,
+        "connections_open": connected,
+        "open_s": round(open_elapsed, 2),
+        "events_received": len(received),
+        "fanout_p50_ms": round(received[len(received) // 2] * 1000, 2) if received else None,
+        "fanout_max_ms": round(received[-1] * 1000, 2) if received else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.connections, args.timeout))
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark del job nocturno de rachas (habits.maintenance.decay_streaks).
+
+Crea una base de datos SQLite temporal con N hábitos repartidos entre
+usuarios, con fechas de último completado aleatorias, y mide el job:
+
+    python -m benchmarks.streak_decay --habits 1000000 --habits-per-user 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from models import Habit, User, UserHabitStats
+from models.user import Base
+from habits.maintenance import decay_streaks
+
+CHUNK = 50_000
+
+
+async def run(total_habits: int, habits_per_user: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    today = date.today()
+    users = max(1, total_habits // habits_per_user)
+
+    path = os.path.join(tempfile.mkdtemp(), "streak_decay.sqlite")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    seed_start = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        now = datetime.utcnow()
+        for first in range(1, users + 1, CHUNK):
+            ids = range(first, min(first + CHUNK, users + 1))
+            await db.execute(insert(User), [
+                {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "full_name": f"U {i}", "created_at": now}
+                for i in ids
+            ])
+            await db.execute(insert(UserHabitStats), [
+                {
+                    "id_user": i,
+                    "global_streak": rng.randint(0, 30),
+                    "last_all_completed_date": today - timedelta(days=rng.randint(0, 10)),
+                    "total_habits": habits_per_user,
+                    "completed_today": 0,
+                    "counters_date": today - timedelta(days=1),
+                }
+                for i in ids
+            ])
+
+        for first in range(0, total_habits, CHUNK):
+            await db.execute(insert(Habit), [
+                {
+                    "name": f"h{n}",
+                    "goal": 30,
+                    "streak": rng.randint(0, 60),
+                    "last_completed_date": today - timedelta(days=rng.randint(0, 10)),
+                    "id_user": n % users + 1,
+                    "created_at": now,
+                }
+                for n in range(first, min(first + CHUNK, total_habits))
+            ])
+        await db.commit()
+    seed_elapsed = time.perf_counter() - seed_start
+
+    async with AsyncSession(engine) as db:
+        report = await decay_streaks(db, today)
+    await engine.dispose()
+    os.remove(path)
+
+    return {"habits": total_habits, "users": users, "seed_s": round(seed_elapsed, 2), **report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habits", type=int, default=1_000_000)
+    parser.add_argument("--habits-per-user", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.habits, args.habits_per_user, args.seed))
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Prueba de concurrencia del toggle de hábitos.
+
+Lanza toggles en paralelo (varios por hábito, como móvil + navegador a la vez)
+contra un backend levantado y comprueba que el estado final es coherente:
+cada hábito queda completado hoy si recibió un número impar de toggles y la
+racha global refleja si todos están completados.
+
+    python -m benchmarks.toggle_concurrency --url http://localhost:8000 --habits 5 --toggles 9
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from datetime import date
+
+import httpx
+
+from benchmarks.common import get_token
+
+
+async def run(url: str, habits: int, toggles: int) -> bool:
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        token = await get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        habit_ids = []
+        for i in range(habits):
+            response = await client.post(
+                "/habits",
+                json={"name": f"h{i}_{uuid.uuid4().hex[:6]}", "goal": 30},
+                headers=headers,
+            )
+            response.raise_for_status()
+            habit_ids.append(response.json()["id"])
+
+        responses = await asyncio.gather(*(
+            client.post(f"/habits/{habit_id}/toggle", headers=headers)
+            for habit_id in habit_ids
+            for _ in range(toggles)
+        ))
+        failed = [r.status_code for r in responses if r.status_code != 200]
+
+        today = date.today().isoformat()
+        final = (await client.get("/habits", headers=headers)).json()
+        stats = (await client.get("/habits/stats", headers=headers)).json()
+
+    expected_done = toggles % 2 == 1
+    ok = not failed
+    for habit in final:
+        done = habit["last_completed_date"] == today
+        if done != expected_done or habit["streak"] != int(expected_done):
+            print(f"Estado incoherente en el hábito {habit['id']}: {habit}")
+            ok = False
+
+    expected_global = 1 if expected_done else 0
+    if stats["global_streak"] != expected_global:
+        print(f"Racha global incoherente: {stats} (esperada {expected_global})")
+        ok = False
+
+    print(f"toggles: {habits * toggles}, errores HTTP: {len(failed)}, coherente: {ok}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--habits", type=int, default=5)
+    parser.add_argument("--toggles", type=int, default=9)
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run(args.url, args.habits, args.toggles)) else 1)
+
+
+if __name__ == "__main__":
+    main()
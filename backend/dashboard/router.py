@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+
+from dashboard.schemas import DashboardResponse
+from auth.dependencies import get_current_user_id
+from auth.profile import load_profile
+from habits.schemas import HabitStatsResponse
+from tasks.summary import load_summary
+from database import AsyncSessionLocal
+from models.task import Task
+from models.habits import Habit
+from models.user_stats import UserHabitStats
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+async def _fetch_all(query) -> list:
+    """Ejecuta la consulta en su propia sesión para poder lanzarlas en paralelo"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return result.scalars().all()
+
+
+async def _load_profile(user_id: int):
+    async with AsyncSessionLocal() as session:
+        return await load_profile(session, user_id)
+
+
+async def _load_summary(user_id: int) -> dict:
+    async with AsyncSessionLocal() as session:
+        return await load_summary(session, user_id)
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    tasks_due_days: Optional[int] = Query(None, ge=0, le=365),
+    tasks_limit: Optional[int] = Query(None, ge=1, le=500),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Todo lo que necesita el dashboard en una sola petición.
+
+    Valida el token una vez y lanza en paralelo la carga del perfil (caché de
+    perfiles o una consulta), tareas, resumen de tareas, hábitos y
+    estadísticas, cada una en su propia sesión.
+
+    - `tasks_due_days`: solo tareas que vencen en los próximos N días (incluye las vencidas).
+    - `tasks_limit`: número máximo de tareas, ordenadas por fecha de vencimiento.
+    """
+    tasks_query = select(Task).where(Task.id_user == user_id).order_by(Task.due_date, Task.id)
+    if tasks_due_days is not None:
+        tasks_query = tasks_query.where(Task.due_date <= datetime.utcnow() + timedelta(days=tasks_due_days))
+    if tasks_limit is not None:
+        tasks_query = tasks_query.limit(tasks_limit)
+
+    profile, tasks, task_summary, habits, stats = await asyncio.gather(
+        _load_profile(user_id),
+        _fetch_all(tasks_query),
+        _load_summary(user_id),
+        _fetch_all(select(Habit).where(Habit.id_user == user_id)),
+        _fetch_all(select(UserHabitStats).where(UserHabitStats.id_user == user_id)),
+    )
+
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    stats = stats[0] if stats else None
+    return DashboardResponse(
+        user=profile,
+        tasks=tasks,
+        task_summary=task_summary,
+        habits=habits,
+        habit_stats=HabitStatsResponse(
+            global_streak=stats.global_streak if stats else 0,
+            last_all_completed_date=stats.last_all_completed_date if stats else None,
+        ),
+    )
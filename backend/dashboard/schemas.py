@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+from auth.schemas import UserResponse
+from tasks.schemas import TaskResponse, TaskSummaryResponse
+from habits.schemas import HabitResponse, HabitStatsResponse
+
+
+class DashboardResponse(BaseModel):
+    user: UserResponse
+    tasks: list[TaskResponse]
+    task_summary: TaskSummaryResponse
+    habits: list[HabitResponse]
+    habit_stats: HabitStatsResponse
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from config import settings
+
+
+def _async_url(url: str) -> str:
+    """Convierte la URL de conexión a su driver asíncrono equivalente.
+
+    Permite seguir usando los .env antiguos (mysql+pymysql://, sqlite://).
+    """
+    if url.startswith("mysql+pymysql://"):
+        return url.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+    if url.startswith("mysql://"):
+        return url.replace("mysql://", "mysql+aiomysql://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+# 1. URL de conexión para MariaDB/MySQL (driver asíncrono)
+DATABASE_URL = _async_url(settings.DATABASE_URL)
+
+# Motor y sesiones asíncronas: las consultas ya no bloquean el event loop
+engine = create_async_engine(DATABASE_URL, pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# Sesiones de los endpoints de escritura (ver auth.dependencies.get_db). Solo
+# cambian algo en SQLite: sus transacciones empiezan con BEGIN IMMEDIATE.
+WRITE_OPTIONS = {"sqlite_begin_immediate": True}
+WriteSessionLocal = async_sessionmaker(
+    bind=engine.execution_options(**WRITE_OPTIONS),
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def begin_write(db: AsyncSession):
+    """Abre en `db` una transacción de escritura (BEGIN IMMEDIATE en SQLite)
+
+    Para las escrituras ocasionales de una petición de lectura, que usa una
+    sesión de AsyncSessionLocal. La sesión no debe tener una transacción abierta.
+    """
+    await db.connection(execution_options=WRITE_OPTIONS)
+
+
+# SQLite (desarrollo local / pruebas) ignora SELECT ... FOR UPDATE: las
+# transacciones de escritura se abren con BEGIN IMMEDIATE, que toma el bloqueo
+# de escritura desde el principio, para que los read-modify-write concurrentes
+# (toggle de hábitos, rotación de refresh tokens) se serialicen igual que con
+# los bloqueos de fila de MariaDB. Las lecturas usan un BEGIN normal y siguen
+# en paralelo.
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_disable_autobegin(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _sqlite_begin(connection):
+        if connection.get_execution_options().get("sqlite_begin_immediate"):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            connection.exec_driver_sql("BEGIN")
@@ -0,0 +1,86 @@
+"""
+ETag / If-None-Match para los listados del usuario.
+
+Cada usuario tiene una fila en user_data_versions con un contador por recurso
+que los endpoints de escritura incrementan en su misma transacción. Los GET
+construyen el ETag a partir de ese contador (una lectura por clave primaria)
+y, si coincide con If-None-Match, responden 304 sin ejecutar la consulta del
+listado ni serializar nada.
+"""
+from typing import Literal, Optional
+import hashlib
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user_data_version import UserDataVersion
+
+Resource = Literal["tasks", "habits"]
+
+
+async def bump_version(db: AsyncSession, user_id: int, resource: Resource):
+    """Incrementa la versión del recurso (llamar antes del commit de la escritura)"""
+    column = getattr(UserDataVersion, f"{resource}_version")
+    result = await db.execute(
+        update(UserDataVersion)
+        .where(UserDataVersion.id_user == user_id)
+        .values({column: column + 1})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+
+    # Primera escritura del usuario: crear la fila
+    try:
+        async with db.begin_nested():
+            db.add(UserDataVersion(id_user=user_id, **{f"{resource}_version": 1}))
+    except IntegrityError:
+        # Otra petición la creó a la vez
+        await db.execute(
+            update(UserDataVersion)
+            .where(UserDataVersion.id_user == user_id)
+            .values({column: column + 1})
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def bump_all_versions(db: AsyncSession, resource: Resource):
+    """Incrementa la versión del recurso para todos los usuarios (jobs masivos)"""
+    column = getattr(UserDataVersion, f"{resource}_version")
+    await db.execute(
+        update(UserDataVersion)
+        .values({column: column + 1})
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def current_etag(db: AsyncSession, user_id: int, resource: Resource, request: Request) -> str:
+    """ETag fuerte del recurso: usuario + versión + parámetros de la query"""
+    column = getattr(UserDataVersion, f"{resource}_version")
+    result = await db.execute(select(column).where(UserDataVersion.id_user == user_id))
+    version = result.scalar() or 0
+
+    # La ruta y los filtros cambian la representación, así que forman parte del ETag
+    representation = f"{request.url.path}?{request.query_params}"
+    digest = hashlib.blake2s(representation.encode(), digest_size=6).hexdigest()
+    return f'"{resource}-{user_id}-{version}-{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Devuelve una respuesta 304 si el cliente ya tiene esta versión, si no None"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    return None
+
+
+def etag_headers(etag: str) -> dict:
+    # no-cache: el navegador puede guardar la respuesta pero debe revalidarla siempre
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
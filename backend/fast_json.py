@@ -0,0 +1,28 @@
+"""
+Respuestas JSON rápidas para los listados.
+
+En lugar de cargar objetos del ORM y dejar que FastAPI los valide uno a uno
+contra el response_model (from_attributes) antes de codificarlos, se
+seleccionan solo las columnas del schema como filas planas y se codifican
+directamente con orjson. El response_model se mantiene en el endpoint para la
+documentación OpenAPI: al devolver una Response, FastAPI no vuelve a validar.
+"""
+from typing import Optional
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def columns_for(model, schema: type[BaseModel]) -> list:
+    """Columnas del modelo SQLAlchemy que corresponden a los campos del schema"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(rows, headers: Optional[dict] = None) -> Response:
+    """Codifica una lista de filas (RowMapping) como JSON con orjson"""
+    return Response(
+        content=orjson.dumps([dict(row) for row in rows]),
+        media_type="application/json",
+        headers=headers,
+    )
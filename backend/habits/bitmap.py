@@ -0,0 +1,99 @@
+"""
+Utilidades para el historial de hábitos codificado como bitmap.
+
+Cada año se guarda en 46 bytes (368 bits, sobran 2): el bit i corresponde al
+día i del año (0 = 1 de enero) y vale 1 si el hábito se completó ese día.
+Para calcular rachas se concatenan los años en un único entero de Python
+donde el bit i es el día i contado desde el 1 de enero del primer año.
+"""
+from datetime import date, timedelta
+from typing import Optional
+import calendar
+
+BYTES_PER_YEAR = 46
+
+
+def empty_year() -> bytes:
+    return bytes(BYTES_PER_YEAR)
+
+
+def day_of_year(day: date) -> int:
+    """Índice del día dentro de su año (0 = 1 de enero)"""
+    return day.timetuple().tm_yday - 1
+
+
+def is_day_set(bits: bytes, day: date) -> bool:
+    return bool((int.from_bytes(bits, "little") >> day_of_year(day)) & 1)
+
+
+def set_day(bits: bytes, day: date, completed: bool) -> bytes:
+    """Devuelve una copia del bitmap del año con el día marcado o desmarcado"""
+    value = int.from_bytes(bits, "little")
+    mask = 1 << day_of_year(day)
+    value = value | mask if completed else value & ~mask
+    return value.to_bytes(BYTES_PER_YEAR, "little")
+
+
+def completed_days(year: int, bits: Optional[bytes]) -> list[date]:
+    """Lista de días completados de un año a partir de su bitmap"""
+    if not bits:
+        return []
+    value = int.from_bytes(bits, "little")
+    start = date(year, 1, 1)
+    days = []
+    while value:
+        low = value & -value
+        days.append(start + timedelta(days=low.bit_length() - 1))
+        value ^= low
+    return days
+
+
+class Timeline:
+    """Varios años de bitmaps concatenados en un único entero"""
+
+    def __init__(self, years: dict[int, bytes]):
+        self.start = date(min(years), 1, 1) if years else None
+        self.bits = 0
+        if not years:
+            return
+
+        offset = 0
+        for year in range(min(years), max(years) + 1):
+            days_in_year = 366 if calendar.isleap(year) else 365
+            year_bits = int.from_bytes(years.get(year) or b"", "little")
+            self.bits |= (year_bits & ((1 << days_in_year) - 1)) << offset
+            offset += days_in_year
+
+    def _index(self, day: date) -> int:
+        return (day - self.start).days
+
+    def last_completed(self, until: date) -> Optional[date]:
+        """Último día completado en o antes de `until`"""
+        if self.start is None or until < self.start:
+            return None
+        window = self.bits & ((1 << (self._index(until) + 1)) - 1)
+        if not window:
+            return None
+        return self.start + timedelta(days=window.bit_length() - 1)
+
+    def streak_ending(self, day: date) -> int:
+        """
+        Racha que termina en `day` aplicando el día de cortesía
+
+        Se rellenan los huecos de un solo día (0 con 1 a ambos lados) y se
+        busca el tramo continuo de unos que acaba en `day`; la racha son los
+        días realmente completados dentro de ese tramo.
+        """
+        if self.start is None or day < self.start:
+            return 0
+        end = self._index(day)
+        if not (self.bits >> end) & 1:
+            return 0
+
+        filled = self.bits | ((self.bits << 1) & (self.bits >> 1))
+
+        # Posición del último 0 antes de `end`: el tramo empieza justo después
+        zeros = ~filled & ((1 << (end + 1)) - 1)
+        begin = zeros.bit_length()
+        run = (self.bits >> begin) & ((1 << (end - begin + 1)) - 1)
+        return run.bit_count()
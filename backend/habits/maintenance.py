@@ -0,0 +1,120 @@
+"""
+Mantenimiento nocturno de rachas.
+
+Las rachas solo se corregían cuando el usuario marcaba un hábito, así que quien
+deja de usar la app conservaba una racha caducada para siempre. Este job las
+pone a 0 con unas pocas sentencias UPDATE sobre todas las filas, sin cargar
+objetos del ORM, aplicando las mismas reglas que toggle_habit:
+
+- Racha de un hábito: se pierde si no se completó hoy, ayer ni anteayer.
+- Racha global: se pierde si el último día con 100% no fue hoy ni ayer.
+
+También purga los tombstones de /sync más antiguos que
+SYNC_TOMBSTONE_RETENTION_DAYS.
+
+Uso (p. ej. desde cron, una vez al día pasada la medianoche):
+
+    python -m habits.maintenance
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+import asyncio
+import time
+
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from etags import bump_all_versions
+from models.deleted_record import DeletedRecord
+from models.habits import Habit
+from models.user_stats import UserHabitStats
+
+
+async def decay_streaks(db: AsyncSession, today: Optional[date] = None) -> dict:
+    """
+    Resetea las rachas rotas de todos los usuarios
+
+    Args:
+        db: Sesión de base de datos
+        today: Día de referencia (por defecto hoy)
+
+    Returns:
+        Informe con las filas modificadas por cada sentencia y el tiempo empleado
+    """
+    today = today or date.today()
+    two_days_ago = today - timedelta(days=2)
+    yesterday = today - timedelta(days=1)
+    report = {"date": today.isoformat()}
+    start = time.perf_counter()
+
+    # 1. Rachas individuales fuera del período de gracia
+    result = await db.execute(
+        update(Habit)
+        .where(
+            Habit.streak > 0,
+            or_(Habit.last_completed_date.is_(None), Habit.last_completed_date < two_days_ago),
+        )
+        .values(streak=0)
+        .execution_options(synchronize_session=False)
+    )
+    report["habits_reset"] = result.rowcount
+
+    # 2. Rachas globales sin un día al 100% hoy o ayer
+    result = await db.execute(
+        update(UserHabitStats)
+        .where(
+            UserHabitStats.global_streak > 0,
+            or_(
+                UserHabitStats.last_all_completed_date.is_(None),
+                UserHabitStats.last_all_completed_date < yesterday,
+            ),
+        )
+        .values(global_streak=0)
+        .execution_options(synchronize_session=False)
+    )
+    report["global_streaks_reset"] = result.rowcount
+
+    # 3. Contadores diarios de días anteriores (los sin fecha se calculan al usarlos)
+    result = await db.execute(
+        update(UserHabitStats)
+        .where(and_(
+            UserHabitStats.counters_date.is_not(None),
+            UserHabitStats.counters_date < today,
+        ))
+        .values(completed_today=0, counters_date=today)
+        .execution_options(synchronize_session=False)
+    )
+    report["counters_rolled"] = result.rowcount
+
+    # Las rachas cambiadas invalidan los ETag de /habits y /habits/stats
+    if report["habits_reset"] or report["global_streaks_reset"]:
+        await bump_all_versions(db, "habits")
+
+    await db.commit()
+    report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return report
+
+
+async def purge_tombstones(db: AsyncSession) -> dict:
+    """Borra los tombstones que ya no puede pedir ningún cursor válido de /sync"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = await db.execute(delete(DeletedRecord).where(DeletedRecord.deleted_at < cutoff))
+    await db.commit()
+    return {"tombstones_purged": result.rowcount}
+
+
+async def _run():
+    from database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        report = await decay_streaks(db)
+        report.update(await purge_tombstones(db))
+    await engine.dispose()
+
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_run())
@@ -1,23 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
-
-from habits.schemas import HabitCreate, HabitUpdate, HabitResponse
+from typing import Optional
+
+from habits.schemas import (
+    HabitCreate,
+    HabitUpdate,
+    HabitResponse,
+    HabitHistoryResponse,
+    HabitStatsResponse,
+)
+from habits.bitmap import Timeline, completed_days, empty_year, is_day_set, set_day
 from auth.dependencies import get_current_user, get_db
+from etags import bump_version, current_etag, etag_headers, not_modified
+from fast_json import columns_for, rows_response
+from sync.tombstones import record_deletions
+from sync.events import publish_change
 from models.habits import Habit
+from models.habit_history import HabitHistory
 from models.user import User
 from models.user_stats import UserHabitStats
 
 router = APIRouter(prefix="/habits", tags=["Habits"])
 
 
-@router.get("/stats")
+@router.get("/stats", response_model=HabitStatsResponse)
 async def get_habit_stats(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Devuelve la racha global del usuario (días consecutivos con 100% de hábitos completados)."""
-    stats = db.query(UserHabitStats).filter(UserHabitStats.id_user == current_user.id).first()
+    etag = await current_etag(db, current_user.id, "habits", request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers.update(etag_headers(etag))
+
+    result = await db.execute(
+        select(UserHabitStats).where(UserHabitStats.id_user == current_user.id)
+    )
+    stats = result.scalars().first()
     return {
         "global_streak": stats.global_streak if stats else 0,
         "last_all_completed_date": stats.last_all_completed_date if stats else None,
@@ -26,24 +52,39 @@ async def get_habit_stats(
 
 @router.get("", response_model=list[HabitResponse])
 async def list_habits(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Devuelve todos los hábitos del usuario autenticado."""
-    return db.query(Habit).filter(Habit.id_user == current_user.id).all()
+    """Devuelve todos los hábitos del usuario autenticado (con ETag / 304).
+
+    Se leen filas planas y se codifican con orjson (ver fast_json.py).
+    """
+    etag = await current_etag(db, current_user.id, "habits", request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(*columns_for(Habit, HabitResponse)).where(Habit.id_user == current_user.id)
+    )
+    return rows_response(result.mappings().all(), etag_headers(etag))
 
 
 @router.post("", response_model=HabitResponse, status_code=status.HTTP_201_CREATED)
 async def create_habit(
     habit_data: HabitCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Crea un nuevo hábito para el usuario autenticado."""
-    existing = db.query(Habit).filter(
-        Habit.name == habit_data.name,
-        Habit.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Habit).where(
+            Habit.name == habit_data.name,
+            Habit.id_user == current_user.id,
+        )
+    )
+    existing = result.scalars().first()
 
     if existing:
         raise HTTPException(
@@ -51,6 +92,9 @@ async def create_habit(
             detail="Ya tienes un hábito con ese nombre",
         )
 
+    stats = await _load_habit_stats(current_user, db)
+    stats.total_habits += 1
+
     new_habit = Habit(
         name=habit_data.name,
         goal=habit_data.goal,
@@ -58,8 +102,10 @@ async def create_habit(
         id_user=current_user.id,
     )
     db.add(new_habit)
-    db.commit()
-    db.refresh(new_habit)
+    await bump_version(db, current_user.id, "habits")
+    await db.commit()
+    await db.refresh(new_habit)
+    publish_change(current_user.id, "habit", "created", [new_habit.id])
     return new_habit
 
 
@@ -68,13 +114,16 @@ async def update_habit(
     habit_id: int,
     habit_data: HabitUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Edita un hábito (solo si pertenece al usuario autenticado)."""
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Habit).where(
+            Habit.id == habit_id,
+            Habit.id_user == current_user.id,
+        )
+    )
+    habit = result.scalars().first()
 
     if not habit:
         raise HTTPException(
@@ -85,8 +134,10 @@ async def update_habit(
     for field, value in habit_data.model_dump(exclude_unset=True).items():
         setattr(habit, field, value)
 
-    db.commit()
-    db.refresh(habit)
+    await bump_version(db, current_user.id, "habits")
+    await db.commit()
+    await db.refresh(habit)
+    publish_change(current_user.id, "habit", "updated", [habit.id])
     return habit
 
 
@@ -94,13 +145,16 @@ async def update_habit(
 async def delete_habit(
     habit_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Elimina un hábito (solo si pertenece al usuario autenticado)."""
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Habit).where(
+            Habit.id == habit_id,
+            Habit.id_user == current_user.id,
+        ).with_for_update()
+    )
+    habit = result.scalars().first()
 
     if not habit:
         raise HTTPException(
@@ -108,24 +162,114 @@ async def delete_habit(
             detail="Hábito no encontrado",
         )
 
-    db.delete(habit)
-    db.commit()
+    stats = await _load_habit_stats(current_user, db)
+    stats.total_habits = max(0, stats.total_habits - 1)
+    if habit.last_completed_date == stats.counters_date:
+        stats.completed_today = max(0, stats.completed_today - 1)
 
+    await db.delete(habit)
+    await record_deletions(db, current_user.id, "habit", [habit.id])
+    await bump_version(db, current_user.id, "habits")
+    await db.commit()
+    publish_change(current_user.id, "habit", "deleted", [habit.id])
 
-def _update_global_streak(current_user: User, db: Session):
-    """Recalcula y actualiza la racha global tras un toggle."""
-    today = date.today()
-    yesterday = today - timedelta(days=1)
 
-    all_habits = db.query(Habit).filter(Habit.id_user == current_user.id).all()
-    all_completed_today = len(all_habits) > 0 and all(
-        h.last_completed_date == today for h in all_habits
+@router.get("/{habit_id}/history", response_model=HabitHistoryResponse)
+async def get_habit_history(
+    habit_id: int,
+    year: Optional[int] = Query(None, ge=1970, le=9999),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Días completados de un hábito en un año (para el calendario / heatmap).
+
+    Lee una sola fila: el bitmap de 46 bytes de ese año.
+    """
+    if year is None:
+        year = date.today().year
+    result = await db.execute(
+        select(Habit.id, HabitHistory.bits)
+        .outerjoin(
+            HabitHistory,
+            and_(HabitHistory.id_habit == Habit.id, HabitHistory.year == year),
+        )
+        .where(Habit.id == habit_id, Habit.id_user == current_user.id)
     )
+    row = result.first()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hábito no encontrado",
+        )
+
+    days = completed_days(year, row.bits)
+    return HabitHistoryResponse(habit_id=habit_id, year=year, completed_days=days, total=len(days))
+
+
+def _seed_history(habit: Habit, history: dict[int, HabitHistory], db: AsyncSession):
+    """Crea el historial de hábitos anteriores al bitmap a partir de su racha actual.
 
-    stats = db.query(UserHabitStats).filter(UserHabitStats.id_user == current_user.id).first()
+    No se conocen los días exactos, así que se asume que la racha fue continua.
+    """
+    for offset in range(habit.streak):
+        day = habit.last_completed_date - timedelta(days=offset)
+        row = history.get(day.year)
+        if row is None:
+            row = HabitHistory(id_habit=habit.id, year=day.year, bits=empty_year())
+            db.add(row)
+            history[day.year] = row
+        row.bits = set_day(row.bits, day, True)
+
+
+async def _load_habit_stats(current_user: User, db: AsyncSession) -> UserHabitStats:
+    """Devuelve las stats del usuario con los contadores referidos a hoy.
+
+    Los contadores solo se recalculan con una consulta la primera vez (filas
+    sin counters_date); al cambiar de día basta con poner completed_today a 0.
+    Hay que llamarla antes de modificar los hábitos de la petición.
+
+    La fila queda bloqueada (SELECT ... FOR UPDATE) hasta el commit para que
+    dos peticiones simultáneas no pisen los contadores. Orden de bloqueo:
+    siempre el hábito antes que las stats.
+    """
+    today = date.today()
+    query = select(UserHabitStats).where(UserHabitStats.id_user == current_user.id).with_for_update()
+
+    result = await db.execute(query)
+    stats = result.scalars().first()
     if stats is None:
-        stats = UserHabitStats(id_user=current_user.id, global_streak=0, last_all_completed_date=None)
-        db.add(stats)
+        try:
+            async with db.begin_nested():
+                stats = UserHabitStats(id_user=current_user.id, global_streak=0, last_all_completed_date=None)
+                db.add(stats)
+        except IntegrityError:
+            # Otra petición la creó a la vez: usar la suya
+            result = await db.execute(query)
+            stats = result.scalars().first()
+
+    if stats.counters_date is None:
+        result = await db.execute(
+            select(
+                func.count(Habit.id),
+                func.count(case((Habit.last_completed_date == today, 1))),
+            ).where(Habit.id_user == current_user.id)
+        )
+        stats.total_habits, stats.completed_today = result.one()
+        stats.counters_date = today
+    elif stats.counters_date != today:
+        stats.completed_today = 0
+        stats.counters_date = today
+
+    return stats
+
+
+def _update_global_streak(stats: UserHabitStats):
+    """Actualiza la racha global tras un toggle comparando los contadores (O(1))."""
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+
+    all_completed_today = stats.total_habits > 0 and stats.completed_today >= stats.total_habits
 
     if all_completed_today:
         if stats.last_all_completed_date != today:
@@ -141,28 +285,34 @@ def _update_global_streak(current_user: User, db: Session):
             stats.global_streak = max(0, stats.global_streak - 1)
             stats.last_all_completed_date = yesterday if stats.global_streak > 0 else None
 
-    db.commit()
-
 
 @router.post("/{habit_id}/toggle", response_model=HabitResponse)
 async def toggle_habit(
     habit_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Marca o desmarca un hábito como completado hoy.
 
-    Lógica de racha individual (con día de cortesía):
-    - Ya completado hoy         → desmarca (racha -1)
-    - Completado ayer o anteayer → sigue la racha (racha +1, sin perderla)
+    El día se marca en el bitmap del año y la racha se recalcula a partir del
+    historial (con día de cortesía: se puede saltar un día sin perderla):
+    - Ya completado hoy         → desmarca y vuelve a la racha anterior
+    - Completado ayer o anteayer → sigue la racha
     - Más de 2 días sin marcar  → racha rota, reinicia a 1
 
     Además actualiza la racha global (días con 100% completado).
+
+    Todo ocurre en una transacción con el hábito y las stats bloqueados
+    (SELECT ... FOR UPDATE), así que dos toggles simultáneos (móvil y
+    navegador) se serializan en lugar de perder una actualización.
     """
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Habit).where(
+            Habit.id == habit_id,
+            Habit.id_user == current_user.id,
+        ).with_for_update()
+    )
+    habit = result.scalars().first()
 
     if not habit:
         raise HTTPException(
@@ -172,24 +322,39 @@ async def toggle_habit(
 
     today = date.today()
     two_days_ago = today - timedelta(days=2)
-
-    if habit.last_completed_date == today:
-        # Desmarcar: revertir
-        habit.streak = max(0, habit.streak - 1)
-        habit.last_completed_date = None
-    elif habit.last_completed_date is not None and habit.last_completed_date >= two_days_ago:
-        # Dentro del período de gracia (ayer o anteayer): la racha sigue
-        habit.streak += 1
-        habit.last_completed_date = today
+    stats = await _load_habit_stats(current_user, db)
+
+    result = await db.execute(select(HabitHistory).where(HabitHistory.id_habit == habit.id))
+    history = {row.year: row for row in result.scalars().all()}
+
+    if not history and habit.last_completed_date is not None and habit.streak > 0:
+        _seed_history(habit, history, db)
+
+    row = history.get(today.year)
+    if row is None:
+        row = HabitHistory(id_habit=habit.id, year=today.year, bits=empty_year())
+        db.add(row)
+        history[today.year] = row
+
+    # Marcar o desmarcar hoy en el bitmap
+    completed = not is_day_set(row.bits, today)
+    row.bits = set_day(row.bits, today, completed)
+    stats.completed_today += 1 if completed else -1
+
+    # Recalcular racha y último completado desde el historial
+    timeline = Timeline({year: r.bits for year, r in history.items()})
+    last = timeline.last_completed(today)
+    habit.last_completed_date = last
+    if last is not None and last >= two_days_ago:
+        habit.streak = timeline.streak_ending(last)
     else:
-        # Primera vez o racha rota (más de 2 días sin marcar)
-        habit.streak = 1
-        habit.last_completed_date = today
-
-    db.commit()
-    db.refresh(habit)
+        habit.streak = 0
 
-    # Actualizar racha global
-    _update_global_streak(current_user, db)
+    # Actualizar racha global (se guarda en el mismo commit)
+    _update_global_streak(stats)
+    await bump_version(db, current_user.id, "habits")
 
+    # Con expire_on_commit=False el objeto ya tiene los valores finales: sin refresh
+    await db.commit()
+    publish_change(current_user.id, "habit", "toggled", [habit.id])
     return habit
@@ -27,3 +27,15 @@ class HabitResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class HabitStatsResponse(BaseModel):
+    global_streak: int = 0
+    last_all_completed_date: Optional[date] = None
+
+
+class HabitHistoryResponse(BaseModel):
+    habit_id: int
+    year: int
+    completed_days: list[date]
+    total: int
@@ -0,0 +1,84 @@
+"""
+Endpoints de salud para el orquestador (Docker, Kubernetes...).
+
+- GET /healthz (liveness): el proceso está vivo y el event loop responde. No
+  toca la BD, así que una caída de la BD no provoca reinicios en cadena.
+- GET /readyz (readiness): el worker puede recibir tráfico. Comprueba que la
+  BD responde y que no quedan migraciones pendientes; durante el apagado
+  devuelve 503 para que el orquestador deje de enviarle peticiones.
+"""
+import asyncio
+import random
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from config import settings
+from database import engine
+from migrations.runner import pending_migrations
+
+router = APIRouter(tags=["Health"])
+
+READY_CHECK_TIMEOUT_SECONDS = 2
+
+
+class Readiness:
+    def __init__(self):
+        self.accepting = False   # True entre el arranque y el inicio del apagado
+        self.schema_ok = False   # Se cachea en cuanto no quedan migraciones pendientes
+
+
+readiness = Readiness()
+
+
+async def wait_for_db():
+    """
+    Espera a que la BD acepte conexiones (SELECT 1) con backoff exponencial
+
+    Empieza reintentando a los 0.1 s y dobla la espera hasta 5 s, con algo de
+    jitter, sin pasar de DB_STARTUP_TIMEOUT_SECONDS en total.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.DB_STARTUP_TIMEOUT_SECONDS
+    delay = 0.1
+    while True:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return
+        except (DBAPIError, OSError) as e:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise RuntimeError("La BD no respondió") from e
+            print(f"Esperando a la base de datos ({e.__class__.__name__})...")
+            await asyncio.sleep(min(delay * random.uniform(0.8, 1.2), remaining))
+            delay = min(delay * 2, 5)
+
+
+async def _check_db():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        if not readiness.schema_ok:
+            readiness.schema_ok = not await pending_migrations(conn)
+
+
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    if not readiness.accepting:
+        return JSONResponse({"status": "unavailable"}, status_code=503)
+
+    try:
+        await asyncio.wait_for(_check_db(), READY_CHECK_TIMEOUT_SECONDS)
+    except (DBAPIError, OSError, asyncio.TimeoutError):
+        return JSONResponse({"status": "unavailable", "database": "down"}, status_code=503)
+
+    if not readiness.schema_ok:
+        return JSONResponse({"status": "unavailable", "database": "migrations pending"}, status_code=503)
+    return {"status": "ready"}
@@ -1,52 +1,53 @@
 from contextlib import asynccontextmanager
-import time
-from fastapi import FastAPI, Depends
+import asyncio
+import math
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import OperationalError
-import os
+from fastapi.responses import JSONResponse
 
 # Importar configuración y modelos
-from config import settings
-from models.user import Base, User
+from database import engine
+from models.user import Base, User  # noqa: F401
 from models.social_account import SocialAccount
 from models.task import Task    # noqa: F401 - necesario para que SQLAlchemy registre la tabla
 from models.habits import Habit        # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.habit_history import HabitHistory  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
 from models.user_stats import UserHabitStats  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.user_data_version import UserDataVersion  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.deleted_record import DeletedRecord  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.refresh_token import RefreshToken  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.revoked_token import RevokedToken  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from models.task_summary import UserTaskSummary  # noqa: F401 - necesario para que SQLAlchemy registre la tabla
+from auth.utils import HashingPoolBusy
+from auth.rate_limit import RateLimited
+from auth.google import google_client
+from auth.revocation import revocations
 from auth.router import router as auth_router
 from auth.oauth import router as oauth_router
 from tasks.router import router as tasks_router
 from habits.router import router as habits_router
-
-# 1. URL de conexión para MariaDB/MySQL
-DATABASE_URL = settings.DATABASE_URL
-
-# El resto es prácticamente IGUAL que antes
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-
-# Crear tablas
-def wait_for_db():
-    for i in range(10):
-        try:
-            Base.metadata.create_all(bind=engine)
-            return
-        except OperationalError:
-            print("Esperando a la base de datos...")
-            time.sleep(2)
-    raise Exception("La BD no respondió")
+from sync.router import router as sync_router
+from dashboard.router import router as dashboard_router
+from health import readiness, router as health_router, wait_for_db
+from metrics import MetricsMiddleware, instrument_engine, router as metrics_router
+from config import settings
 
 
 # ------------------------------------------
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    wait_for_db()
+    # Solo se comprueba la conexión: el esquema lo aplica `python -m migrations`
+    await wait_for_db()
+    # Tokens revocados: una consulta al arrancar y después solo los nuevos
+    await revocations.load()
+    revocation_sync = asyncio.create_task(revocations.run())
+    readiness.accepting = True
     yield
+    readiness.accepting = False
+    revocation_sync.cancel()
+    await google_client.close()
+    await engine.dispose()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -57,25 +58,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  ## EN PRODUCCIÓN (corely.es) CAMBIAR "*" POR LA URL DEL FRONTEND
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Incluir routers de autenticación
-app.include_router(auth_router)
-app.include_router(oauth_router)
-app.include_router(tasks_router)
-app.include_router(habits_router)
-
+# Métricas por petición (al añadirlo el último queda como el middleware más externo)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(_: Request, __: HashingPoolBusy):
+    """Cola de bcrypt llena: pedir al cliente que reintente en lugar de encolar sin límite"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Servidor ocupado, inténtalo de nuevo en unos segundos"},
+        headers={"Retry-After": "1"},
+    )
 
 
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(_: Request, exc: RateLimited):
+    """Demasiados intentos: se responde antes de hacer ningún hash"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Demasiados intentos, inténtalo de nuevo más tarde"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
 
 
+# Incluir routers de autenticación
+app.include_router(auth_router)
+app.include_router(oauth_router)
+app.include_router(tasks_router)
+app.include_router(habits_router)
+app.include_router(sync_router)
+app.include_router(dashboard_router)
+app.include_router(health_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
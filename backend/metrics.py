@@ -0,0 +1,269 @@
+"""
+Instrumentación de peticiones y endpoint /metrics en formato texto de Prometheus.
+
+- MetricsMiddleware (ASGI puro) mide cada petición por método y ruta (la
+  plantilla, p. ej. /tasks/{task_id}, para no disparar la cardinalidad):
+  histograma de latencia, contador por código de estado y peticiones en curso.
+- Los eventos del engine de SQLAlchemy cuentan las consultas y el tiempo en BD
+  de la petición en curso (vía contextvar) y escriben en el logger
+  `corely.slow_query` las que superan SLOW_QUERY_MS.
+- GET /metrics añade el estado del pool de conexiones, del pool de bcrypt, del
+  rate limit de auth, del filtro de tokens revocados, de las cachés de
+  usuarios/perfiles y del broker SSE.
+
+Todo vive en memoria del worker y sin dependencias externas: el coste por
+petición son unas pocas operaciones sobre diccionarios. Con varios workers de
+uvicorn cada uno expone sus propias métricas. El endpoint no lleva
+autenticación: en producción solo debe ser accesible desde la red interna.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from auth import rate_limit
+from auth.cache import profile_cache, user_cache
+from auth.revocation import revocations
+from auth.utils import get_hash_pool_metrics
+from config import settings
+from database import engine
+from sync.events import broker
+
+logger = logging.getLogger("corely.slow_query")
+
+# Cubren desde un GET servido por la caché hasta un login con bcrypt
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class Histogram:
+    """Histograma con cubos fijos por combinación de etiquetas"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.series: dict[tuple, list] = {}  # etiquetas → [cuentas por cubo..., suma, total]
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.queries_per_request = Histogram(QUERY_BUCKETS)
+        self.responses: dict[tuple, int] = {}      # (método, ruta, estado) → peticiones
+        self.db_queries: dict[tuple, int] = {}     # (método, ruta) → consultas
+        self.db_seconds: dict[tuple, float] = {}   # (método, ruta) → segundos en BD
+        self.active: dict[int, dict] = {}          # id(scope) → scope de las peticiones en curso
+        self.queries_total = 0
+        self.query_seconds_total = 0.0
+        self.slow_queries_total = 0
+
+
+request_metrics = RequestMetrics()
+
+# [consultas, segundos en BD, scope] de la petición en curso
+_current_request: ContextVar[Optional[list]] = ContextVar("current_request", default=None)
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        counter = [0, 0.0, scope]
+        token = _current_request.set(counter)
+        request_metrics.active[id(scope)] = scope
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            del request_metrics.active[id(scope)]
+
+            key = (scope["method"], _route_label(scope))
+            request_metrics.duration.observe(key, elapsed)
+            request_metrics.queries_per_request.observe((), counter[0])
+            response_key = key + (str(status_code),)
+            request_metrics.responses[response_key] = request_metrics.responses.get(response_key, 0) + 1
+            if counter[0]:
+                request_metrics.db_queries[key] = request_metrics.db_queries.get(key, 0) + counter[0]
+                request_metrics.db_seconds[key] = request_metrics.db_seconds.get(key, 0.0) + counter[1]
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Registra los eventos que miden cada consulta del engine"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        # BEGIN (o BEGIN IMMEDIATE en SQLite) es control de transacción, no una consulta
+        if statement.startswith("BEGIN"):
+            return
+        request_metrics.queries_total += 1
+        request_metrics.query_seconds_total += elapsed
+
+        counter = _current_request.get()
+        if counter is not None:
+            counter[0] += 1
+            counter[1] += elapsed
+
+        if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            request_metrics.slow_queries_total += 1
+            scope = counter[2] if counter is not None else None
+            logger.warning(
+                "Consulta lenta (%.1f ms) en %s: %s",
+                elapsed * 1000,
+                f"{scope['method']} {_route_label(scope)}" if scope else "-",
+                " ".join(statement.split())[:500],
+            )
+
+
+# ------------------------------------------
+# Exposición en formato texto de Prometheus
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples, label_names: tuple = ()):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for values, value in samples:
+            self.lines.append(f"{name}{_labels(label_names, values)} {value}")
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, label_names: tuple = ()):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        bucket_names = label_names + ("le",)
+        for values, series in histogram.series.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), series):
+                cumulative += count
+                self.lines.append(f"{name}_bucket{_labels(bucket_names, values + (bound,))} {cumulative}")
+            self.lines.append(f"{name}_sum{_labels(label_names, values)} {series[-2]}")
+            self.lines.append(f"{name}_count{_labels(label_names, values)} {series[-1]}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    m = request_metrics
+    w = _Writer()
+    route = ("method", "route")
+
+    in_flight: dict[tuple, int] = {}
+    for scope in list(m.active.values()):
+        key = (scope["method"], _route_label(scope))
+        in_flight[key] = in_flight.get(key, 0) + 1
+
+    w.histogram("corely_http_request_duration_seconds", "Latencia de las peticiones HTTP", m.duration, route)
+    w.metric("corely_http_requests_total", "counter", "Peticiones HTTP atendidas",
+             m.responses.items(), route + ("status",))
+    w.metric("corely_http_requests_in_flight", "gauge", "Peticiones HTTP en curso", in_flight.items(), route)
+    w.metric("corely_http_request_db_queries_total", "counter", "Consultas SQL hechas por las peticiones",
+             m.db_queries.items(), route)
+    w.metric("corely_http_request_db_seconds_total", "counter", "Tiempo en BD de las peticiones",
+             ((k, round(v, 6)) for k, v in m.db_seconds.items()), route)
+    w.histogram("corely_db_queries_per_request", "Consultas SQL por petición", m.queries_per_request)
+
+    w.metric("corely_db_queries_total", "counter", "Consultas SQL (incluidas las de fuera de peticiones)",
+             [((), m.queries_total)])
+    w.metric("corely_db_query_seconds_total", "counter", "Tiempo total en BD",
+             [((), round(m.query_seconds_total, 6))])
+    w.metric("corely_db_slow_queries_total", "counter", "Consultas por encima de SLOW_QUERY_MS",
+             [((), m.slow_queries_total)])
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        w.metric("corely_db_pool_connections", "gauge", "Conexiones del pool por estado", [
+            (("in_use",), pool.checkedout()),
+            (("idle",), pool.checkedin()),
+        ], ("state",))
+
+    hashing = get_hash_pool_metrics()
+    w.metric("corely_hash_pool_workers", "gauge", "Hilos del pool de bcrypt", [((), hashing["workers"])])
+    w.metric("corely_hash_pool_pending", "gauge", "Trabajos de bcrypt en curso o en cola", [((), hashing["pending"])])
+    for key in ("submitted", "completed", "rejected"):
+        w.metric(f"corely_hash_pool_{key}_total", "counter", f"Trabajos de bcrypt ({key})", [((), hashing[key])])
+    w.metric("corely_hash_pool_busy_seconds_total", "counter", "Tiempo acumulado de los trabajos de bcrypt",
+             [((), round(hashing["busy_seconds"], 6))])
+    w.metric("corely_password_rehashes_total", "counter", "Hashes rehechos con BCRYPT_ROUNDS tras un login",
+             [((), hashing["rehashed"])])
+
+    w.metric("corely_rate_limited_total", "counter", "Intentos de auth rechazados con 429",
+             (((kind,), count) for kind, count in rate_limit.rejected.items()), ("key",))
+    if isinstance(rate_limit.backend, rate_limit.MemoryRateLimitBackend):
+        w.metric("corely_rate_limit_keys", "gauge", "Cubos de rate limit en memoria",
+                 [((), rate_limit.backend.stats()["keys"])])
+
+    revoked = revocations.stats()
+    w.metric("corely_revoked_tokens", "gauge", "Access tokens revocados sin caducar", [((), revoked["revoked"])])
+    w.metric("corely_revocation_filter_bytes", "gauge", "Tamaño del filtro de Bloom", [((), revoked["bloom_bytes"])])
+    w.metric("corely_revocation_checks_total", "counter", "Comprobaciones de revocación", [((), revoked["checks"])])
+    w.metric("corely_revocation_false_positives_total", "counter",
+             "Positivos del filtro de Bloom descartados por el conjunto exacto", [((), revoked["false_positives"])])
+
+    caches = {"user": user_cache.stats(), "profile": profile_cache.stats()}
+    w.metric("corely_cache_entries", "gauge", "Entradas en la caché",
+             (((name,), stats["size"]) for name, stats in caches.items()), ("cache",))
+    for key in ("hits", "misses", "evictions"):
+        w.metric(f"corely_cache_{key}_total", "counter", f"Caché de usuarios ({key})",
+                 (((name,), stats[key]) for name, stats in caches.items()), ("cache",))
+
+    sse = broker.stats()
+    w.metric("corely_sse_connections", "gauge", "Conexiones SSE abiertas", [((), sse["connections"])])
+    w.metric("corely_sse_users", "gauge", "Usuarios con alguna conexión SSE", [((), sse["users"])])
+    w.metric("corely_sse_events_published_total", "counter", "Eventos publicados", [((), sse["published"])])
+    w.metric("corely_sse_overflows_total", "counter", "Colas SSE desbordadas (resync)", [((), sse["overflows"])])
+
+    return w.render()
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1 @@
+# Migraciones de esquema versionadas (ver migrations/runner.py)
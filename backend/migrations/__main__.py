@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+
+from database import engine
+from health import wait_for_db
+from migrations.runner import load_migrations, pending_migrations, upgrade
+
+
+async def _upgrade():
+    applied = await upgrade(engine)
+    for migration in applied:
+        print(f"Aplicada {migration.version}: {migration.description}")
+    if not applied:
+        print("El esquema ya está al día")
+
+
+async def _status():
+    async with engine.connect() as conn:
+        pending = {m.version for m in await pending_migrations(conn)}
+    for migration in load_migrations():
+        state = "pendiente" if migration.version in pending else "aplicada "
+        print(f"[{state}] {migration.version}: {migration.description}")
+
+
+async def _run(command: str):
+    try:
+        await wait_for_db()
+        await (_status() if command == "status" else _upgrade())
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Migraciones del esquema de Corely")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    asyncio.run(_run(parser.parse_args().command))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Operaciones de esquema idempotentes para las migraciones.
+
+Todas comprueban antes si el objeto ya existe: las BD creadas con el antiguo
+`create_all` ya tienen parte del esquema y las migraciones deben poder
+aplicarse sobre ellas sin fallar. Reciben la conexión síncrona de
+`AsyncConnection.run_sync`.
+"""
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+
+def has_table(conn: Connection, table_name: str) -> bool:
+    return inspect(conn).has_table(table_name)
+
+
+def has_column(conn: Connection, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspect(conn).get_columns(table_name))
+
+
+def has_index(conn: Connection, table_name: str, index_name: str) -> bool:
+    return any(idx["name"] == index_name for idx in inspect(conn).get_indexes(table_name))
+
+
+def create_table(conn: Connection, table: Table):
+    """Crea la tabla con sus índices si no existe"""
+    table.create(conn, checkfirst=True)
+
+
+def add_column(conn: Connection, table_name: str, column: Column):
+    """ALTER TABLE ... ADD COLUMN si la columna no existe"""
+    if has_column(conn, table_name, column.name):
+        return
+    # La columna necesita una tabla para compilarse; se usa una de paso
+    Table(table_name, MetaData(), column)
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    table = conn.dialect.identifier_preparer.quote(table_name)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+
+def create_index(conn: Connection, table_name: str, index_name: str, *columns: str, unique: bool = False):
+    """CREATE INDEX si no existe un índice con ese nombre"""
+    if has_index(conn, table_name, index_name):
+        return
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    Index(index_name, *(table.c[name] for name in columns), unique=unique).create(conn)
+
+
+def drop_index(conn: Connection, table_name: str, index_name: str):
+    """DROP INDEX si existe"""
+    if not has_index(conn, table_name, index_name):
+        return
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    next(index for index in table.indexes if index.name == index_name).drop(conn)
+
+
+def rebuild_table(conn: Connection, table: Table):
+    """Rehace una tabla de SQLite con la definición de `table`
+
+    SQLite no puede cambiar NOT NULL ni CHECK con ALTER TABLE: se crea la tabla
+    nueva, se copian las columnas que ya existían, se sustituye la vieja y se
+    vuelven a crear sus índices y triggers. Las vistas apuntan al nombre, así
+    que siguen funcionando.
+    """
+    name = table.name
+    saved = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE tbl_name = :name AND type IN ('index', 'trigger') AND sql IS NOT NULL"),
+        {"name": name},
+    ).scalars().all()
+    existing = {col["name"] for col in inspect(conn).get_columns(name)}
+    columns = ", ".join(col.name for col in table.columns if col.name in existing)
+
+    new_table = table.to_metadata(table.metadata, name=f"{name}_new")
+    conn.execute(CreateTable(new_table))
+    conn.execute(text(f"INSERT INTO {new_table.name} ({columns}) SELECT {columns} FROM {name}"))
+    conn.execute(text(f"DROP TABLE {name}"))
+    # Sin el modo antiguo, RENAME valida las vistas que aún apuntan a la tabla borrada
+    conn.execute(text("PRAGMA legacy_alter_table = ON"))
+    conn.execute(text(f"ALTER TABLE {new_table.name} RENAME TO {name}"))
+    conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+    for sql in saved:
+        conn.execute(text(sql))
@@ -0,0 +1,117 @@
+"""
+Runner de migraciones versionadas.
+
+Cada módulo de migrations/versions es una migración: el prefijo numérico del
+nombre de fichero es su versión, la primera línea del docstring su descripción
+y `upgrade(conn)` aplica los cambios sobre la conexión síncrona. Las versiones
+aplicadas se guardan en la tabla `schema_migrations`.
+
+Las migraciones se aplican como un paso aparte del arranque de la API:
+
+    python -m migrations            # aplica las pendientes
+    python -m migrations status     # muestra aplicadas y pendientes
+
+Con MariaDB se toma un bloqueo con nombre (GET_LOCK) para que dos despliegues
+simultáneos no apliquen la misma migración a la vez. Como allí el DDL hace
+commit implícito, las operaciones de migrations/ops.py son idempotentes y una
+migración interrumpida se puede volver a lanzar sin más.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+import importlib
+import pkgutil
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from migrations import ops, versions
+
+LOCK_NAME = "corely_migrations"
+LOCK_TIMEOUT_SECONDS = 60
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(32), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_migrations() -> list[Migration]:
+    """Migraciones disponibles, ordenadas por versión"""
+    migrations = []
+    for info in sorted(pkgutil.iter_modules(versions.__path__), key=lambda m: m.name):
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        migrations.append(Migration(
+            version=info.name.split("_", 1)[0],
+            description=(module.__doc__ or info.name).strip().splitlines()[0],
+            upgrade=module.upgrade,
+        ))
+    return migrations
+
+
+def _applied_versions(conn: Connection) -> set[str]:
+    if not ops.has_table(conn, schema_migrations.name):
+        return set()
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+async def pending_migrations(conn: AsyncConnection) -> list[Migration]:
+    """Migraciones que aún no se han aplicado en esta BD"""
+    applied = await conn.run_sync(_applied_versions)
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+def _apply(conn: Connection, migration: Migration) -> bool:
+    # Se vuelve a comprobar dentro de la transacción por si otro proceso se adelantó
+    schema_migrations.create(conn, checkfirst=True)
+    if migration.version in _applied_versions(conn):
+        return False
+    migration.upgrade(conn)
+    conn.execute(insert(schema_migrations).values(
+        version=migration.version,
+        description=migration.description[:255],
+        applied_at=datetime.utcnow(),
+    ))
+    return True
+
+
+async def upgrade(engine: AsyncEngine) -> list[Migration]:
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción
+
+    Returns:
+        Las migraciones aplicadas en esta ejecución
+    """
+    applied = []
+    async with engine.connect() as conn:
+        is_mysql = conn.dialect.name in ("mysql", "mariadb")
+        if is_mysql:
+            locked = await conn.scalar(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT_SECONDS},
+            )
+            await conn.commit()
+            if locked != 1:
+                raise RuntimeError("Otro proceso está aplicando migraciones")
+
+        try:
+            for migration in load_migrations():
+                if await conn.run_sync(_apply, migration):
+                    applied.append(migration)
+                await conn.commit()
+        finally:
+            if is_mysql:
+                await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+                await conn.commit()
+    return applied
@@ -0,0 +1,71 @@
+"""Esquema inicial: usuarios, cuentas sociales, tareas, hábitos y racha global
+
+Es el esquema que creaba `Base.metadata.create_all` antes de las migraciones.
+Las tablas se definen aquí congeladas (no desde los modelos) para que la
+migración siga siendo la misma aunque los modelos cambien después.
+"""
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table, Text,
+    UniqueConstraint,
+)
+
+from migrations import ops
+
+
+def upgrade(conn):
+    metadata = MetaData()
+
+    users = Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String(255), unique=True, index=True, nullable=False),
+        Column("username", String(50), unique=True, index=True, nullable=False),
+        Column("full_name", String(100), nullable=False),
+        Column("hashed_password", String(255), nullable=True),
+        Column("avatar_url", Text, nullable=True),
+        Column("is_email_verified", Boolean),
+        Column("created_at", DateTime),
+    )
+    social_accounts = Table(
+        "social_accounts", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("provider", String(50), nullable=False),
+        Column("provider_user_id", String(255), nullable=False),
+        Column("provider_email", String(255), nullable=True),
+        Column("created_at", DateTime),
+        UniqueConstraint("provider", "provider_user_id", name="uq_provider_user"),
+    )
+    tasks = Table(
+        "tasks", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String(50), index=True, nullable=False),
+        Column("priority", String(20), nullable=False),
+        Column("status", String(20), nullable=False),
+        Column("created_at", DateTime),
+        Column("due_date", DateTime, nullable=False),
+        Column("description", Text, nullable=True),
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        UniqueConstraint("name", "id_user", name="uq_task_name_user"),
+    )
+    habits = Table(
+        "habits", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String(50), index=True, nullable=False),
+        Column("goal", Integer, nullable=False),
+        Column("streak", Integer, nullable=False),
+        Column("last_completed_date", Date, nullable=True),
+        Column("color", String(20), nullable=True),
+        Column("created_at", DateTime),
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        UniqueConstraint("name", "id_user", name="uq_habit_name_user"),
+    )
+    user_habit_stats = Table(
+        "user_habit_stats", metadata,
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("global_streak", Integer, nullable=False),
+        Column("last_all_completed_date", Date, nullable=True),
+    )
+
+    for table in (users, social_accounts, tasks, habits, user_habit_stats):
+        ops.create_table(conn, table)
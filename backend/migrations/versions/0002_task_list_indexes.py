@@ -0,0 +1,8 @@
+"""Índices compuestos para el listado paginado y los filtros de GET /tasks"""
+from migrations import ops
+
+
+def upgrade(conn):
+    ops.create_index(conn, "tasks", "ix_tasks_user_due_id", "id_user", "due_date", "id")
+    ops.create_index(conn, "tasks", "ix_tasks_user_status", "id_user", "status")
+    ops.create_index(conn, "tasks", "ix_tasks_user_priority", "id_user", "priority")
@@ -0,0 +1,15 @@
+"""Historial de completados de hábitos: un bitmap de 46 bytes por hábito y año"""
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, MetaData, Table
+
+from migrations import ops
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("habits", metadata, autoload_with=conn)
+    ops.create_table(conn, Table(
+        "habit_history", metadata,
+        Column("id_habit", Integer, ForeignKey("habits.id", ondelete="CASCADE"), primary_key=True),
+        Column("year", Integer, primary_key=True),
+        Column("bits", LargeBinary(46), nullable=False),
+    ))
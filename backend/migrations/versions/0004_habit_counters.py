@@ -0,0 +1,14 @@
+"""Contadores incrementales de hábitos en user_habit_stats
+
+Las filas existentes quedan con counters_date a NULL: los contadores se
+calculan la primera vez que se usan (ver habits/router._load_habit_stats).
+"""
+from sqlalchemy import Column, Date, Integer
+
+from migrations import ops
+
+
+def upgrade(conn):
+    ops.add_column(conn, "user_habit_stats", Column("total_habits", Integer, nullable=False, server_default="0"))
+    ops.add_column(conn, "user_habit_stats", Column("completed_today", Integer, nullable=False, server_default="0"))
+    ops.add_column(conn, "user_habit_stats", Column("counters_date", Date, nullable=True))
@@ -0,0 +1,15 @@
+"""Versión de los datos de cada usuario para los ETag de /tasks y /habits"""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+
+from migrations import ops
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("users", metadata, autoload_with=conn)
+    ops.create_table(conn, Table(
+        "user_data_versions", metadata,
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("tasks_version", Integer, nullable=False, server_default="0"),
+        Column("habits_version", Integer, nullable=False, server_default="0"),
+    ))
@@ -0,0 +1,40 @@
+"""Marcas updated_at y tombstones de borrados para GET /sync
+
+updated_at se añade primero como nullable, se rellena con created_at y en
+MariaDB se pasa después a NOT NULL (SQLite no permite cambiarlo).
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, text
+from sqlalchemy.dialects import mysql
+
+from migrations import ops
+
+TIMESTAMP = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql", "mariadb")
+
+
+def _add_updated_at(conn, table_name: str):
+    ops.add_column(conn, table_name, Column("updated_at", TIMESTAMP, nullable=True))
+    conn.execute(text(
+        f"UPDATE {table_name} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    ))
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text(f"ALTER TABLE {table_name} MODIFY updated_at DATETIME(6) NOT NULL"))
+
+
+def upgrade(conn):
+    _add_updated_at(conn, "tasks")
+    _add_updated_at(conn, "habits")
+    ops.create_index(conn, "tasks", "ix_tasks_user_updated", "id_user", "updated_at")
+    ops.create_index(conn, "habits", "ix_habits_user_updated", "id_user", "updated_at")
+
+    metadata = MetaData()
+    Table("users", metadata, autoload_with=conn)
+    ops.create_table(conn, Table(
+        "deleted_records", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("resource", String(20), nullable=False),
+        Column("record_id", Integer, nullable=False),
+        Column("deleted_at", TIMESTAMP, nullable=False),
+        Index("ix_deleted_records_user_deleted", "id_user", "deleted_at"),
+    ))
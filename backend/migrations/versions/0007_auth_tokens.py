@@ -0,0 +1,28 @@
+"""Refresh tokens rotatorios y access tokens revocados (logout)"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+
+from migrations import ops
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("users", metadata, autoload_with=conn)
+    ops.create_table(conn, Table(
+        "refresh_tokens", metadata,
+        Column("jti", String(32), primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("family_id", String(32), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Column("revoked_at", DateTime, nullable=True),
+        Index("ix_refresh_tokens_family", "family_id"),
+        Index("ix_refresh_tokens_user", "user_id"),
+        Index("ix_refresh_tokens_expires", "expires_at"),
+    ))
+    ops.create_table(conn, Table(
+        "revoked_tokens", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("jti", String(32), unique=True, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Index("ix_revoked_tokens_expires", "expires_at"),
+    ))
@@ -0,0 +1,45 @@
+"""Índice de texto completo sobre el nombre y la descripción de las tareas
+
+MariaDB: índice FULLTEXT (name, description). SQLite: tabla virtual FTS5 de
+contenido externo, mantenida por triggers e indexada con 'rebuild'. Su origen
+es una vista que añade la columna `owner` ('u' || id_user): la búsqueda exige
+ese token y FTS5 cruza las listas de documentos sin recorrer las coincidencias
+de los demás usuarios. Con prefix='2 3 4' las búsquedas por prefijo no tienen
+que expandir todos los términos que empiezan igual.
+"""
+from sqlalchemy import text
+
+from migrations import ops
+
+FULLTEXT_INDEX = "ft_tasks_name_description"
+
+SQLITE_FTS = [
+    "CREATE VIEW IF NOT EXISTS tasks_fts_source AS "
+    "SELECT id, name, description, 'u' || id_user AS owner FROM tasks",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "name, description, owner, content='tasks_fts_source', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    # Los cambios de estado, prioridad o fecha no tocan el índice
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, name, description, owner) "
+    "VALUES (new.id, new.name, new.description, 'u' || new.id_user); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, name, description, owner) "
+    "VALUES ('delete', old.id, old.name, old.description, 'u' || old.id_user); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, description, id_user ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, name, description, owner) "
+    "VALUES ('delete', old.id, old.name, old.description, 'u' || old.id_user); "
+    "INSERT INTO tasks_fts(rowid, name, description, owner) "
+    "VALUES (new.id, new.name, new.description, 'u' || new.id_user); END",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade(conn):
+    if conn.dialect.name in ("mysql", "mariadb"):
+        if not ops.has_index(conn, "tasks", FULLTEXT_INDEX):
+            conn.execute(text(f"ALTER TABLE tasks ADD FULLTEXT INDEX {FULLTEXT_INDEX} (name, description)"))
+        return
+
+    for statement in SQLITE_FTS:
+        conn.execute(text(statement))
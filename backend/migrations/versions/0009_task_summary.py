@@ -0,0 +1,27 @@
+"""Resumen de tareas por usuario e índice (id_user, status, due_date) para las vencidas
+
+Las filas de user_task_summaries se calculan la primera vez que se usan (ver
+tasks/summary.py), o todas de golpe con `python -m tasks.summary`. El nuevo
+índice empieza por (id_user, status), así que sustituye a ix_tasks_user_status.
+"""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+
+from migrations import ops
+
+
+def upgrade(conn):
+    metadata = MetaData()
+    Table("users", metadata, autoload_with=conn)
+    ops.create_table(conn, Table(
+        "user_task_summaries", metadata,
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        Column("total_tasks", Integer, nullable=False, server_default="0"),
+        Column("pending_tasks", Integer, nullable=False, server_default="0"),
+        Column("completed_tasks", Integer, nullable=False, server_default="0"),
+        Column("pending_low", Integer, nullable=False, server_default="0"),
+        Column("pending_medium", Integer, nullable=False, server_default="0"),
+        Column("pending_high", Integer, nullable=False, server_default="0"),
+    ))
+
+    ops.create_index(conn, "tasks", "ix_tasks_user_status_due", "id_user", "status", "due_date")
+    ops.drop_index(conn, "tasks", "ix_tasks_user_status")
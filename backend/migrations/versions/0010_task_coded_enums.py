@@ -0,0 +1,52 @@
+"""Prioridad y estado de las tareas como códigos enteros (fase 1: columnas nuevas)
+
+Cambio en caliente en varias versiones (expandir y contraer), sin parar la API:
+
+- 0010 (esta): añade priority_code ('low'=1, 'medium'=2, 'high'=3) y
+  status_code ('pending'=1, 'completed'=2), nullable y con su CHECK, y sus
+  índices compuestos. El código de esta versión escribe las cadenas y los
+  códigos, y sigue leyendo las cadenas.
+- 0011: rellena por lotes los códigos que falten, los pasa a NOT NULL y las
+  cadenas a nullable; el código de esa versión lee los códigos y sigue
+  escribiendo las cadenas.
+- La versión siguiente deja de escribir las cadenas (sin migración).
+- 0012: borra las columnas de texto y sus índices.
+
+La versión anterior sigue funcionando con esta migración aplicada: las columnas
+nuevas admiten NULL y no las conoce. Las filas que cree mientras se despliega
+se quedan sin código hasta el relleno de 0011.
+
+En MariaDB el ALTER pide LOCK=NONE: añadir columnas nullable y CHECK no copia
+la tabla ni bloquea las escrituras (si el servidor no pudiera hacerlo así, el
+ALTER falla en lugar de bloquear). Los índices se crean en línea.
+"""
+from sqlalchemy import text
+
+from migrations import ops
+
+CHECKS = {"priority": 3, "status": 2}  # Código máximo de cada columna
+
+
+def upgrade(conn):
+    missing = [column for column in CHECKS if not ops.has_column(conn, "tasks", f"{column}_code")]
+    if conn.dialect.name in ("mysql", "mariadb"):
+        if missing:
+            conn.execute(text(
+                "ALTER TABLE tasks "
+                + ", ".join(f"ADD COLUMN {column}_code TINYINT UNSIGNED NULL" for column in missing) + ", "
+                + ", ".join(
+                    f"ADD CONSTRAINT ck_tasks_{column}_code CHECK ({column}_code BETWEEN 1 AND {CHECKS[column]})"
+                    for column in missing
+                )
+                + ", LOCK=NONE"
+            ))
+    else:
+        # En SQLite el CHECK solo se puede declarar al añadir la columna
+        for column in missing:
+            conn.execute(text(
+                f"ALTER TABLE tasks ADD COLUMN {column}_code SMALLINT "
+                f"CONSTRAINT ck_tasks_{column}_code CHECK ({column}_code BETWEEN 1 AND {CHECKS[column]})"
+            ))
+
+    ops.create_index(conn, "tasks", "ix_tasks_user_status_code_due", "id_user", "status_code", "due_date")
+    ops.create_index(conn, "tasks", "ix_tasks_user_priority_code", "id_user", "priority_code")
@@ -0,0 +1,91 @@
+"""Prioridad y estado de las tareas como códigos enteros (fase 2: relleno y NOT NULL)
+
+Va en la versión siguiente a la de 0010: para entonces todas las instancias
+escriben los dos formatos y ninguna fila nueva se queda sin código.
+
+1. Relleno por lotes de BATCH_SIZE ids, con commit tras cada lote, de los
+   códigos que falten (filas anteriores a 0010 o escritas por la versión vieja
+   mientras se desplegaba 0010). Los valores que no están en la lista pasan a
+   'medium' y 'pending'.
+2. Los códigos pasan a NOT NULL y las cadenas a nullable, para que la versión
+   siguiente pueda dejar de escribirlas. En MariaDB es un solo ALTER con
+   LOCK=NONE (reconstruye la tabla en línea, sin bloquear las escrituras); en
+   SQLite, que no puede cambiar NOT NULL con ALTER, se rehace la tabla.
+3. Se vacía user_task_summaries, que se recalcula desde los códigos al pedir
+   cada resumen (los valores desconocidos cuentan ahora como 'pending').
+
+El código de esta versión lee los códigos y sigue escribiendo las cadenas, que
+aún leen las instancias de la versión anterior durante el despliegue.
+"""
+from sqlalchemy import (
+    CheckConstraint, Column, DateTime, ForeignKey, Integer, MetaData, SmallInteger, String, Table, Text,
+    UniqueConstraint, inspect, text,
+)
+
+from migrations import ops
+
+BATCH_SIZE = 10_000
+
+PRIORITY_CODE = "CASE LOWER(priority) WHEN 'low' THEN 1 WHEN 'high' THEN 3 ELSE 2 END"
+STATUS_CODE = "CASE LOWER(status) WHEN 'completed' THEN 2 ELSE 1 END"
+
+
+def _fill_codes(conn, first_id: int, last_id: int):
+    conn.execute(
+        text(
+            f"UPDATE tasks SET priority_code = COALESCE(priority_code, {PRIORITY_CODE}), "
+            f"status_code = COALESCE(status_code, {STATUS_CODE}) "
+            "WHERE id BETWEEN :first_id AND :last_id AND (priority_code IS NULL OR status_code IS NULL)"
+        ),
+        {"first_id": first_id, "last_id": last_id},
+    )
+
+
+def _sqlite_tasks(conn) -> Table:
+    """La tabla tasks de SQLite tal como queda tras esta migración"""
+    metadata = MetaData()
+    Table("users", metadata, autoload_with=conn)
+    return Table(
+        "tasks", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(50), nullable=False),
+        Column("priority", String(20), nullable=True),
+        Column("status", String(20), nullable=True),
+        Column("created_at", DateTime),
+        Column("due_date", DateTime, nullable=False),
+        Column("description", Text, nullable=True),
+        Column("id_user", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("updated_at", DateTime, nullable=True),
+        Column("priority_code", SmallInteger, nullable=False),
+        Column("status_code", SmallInteger, nullable=False),
+        UniqueConstraint("name", "id_user", name="uq_task_name_user"),
+        CheckConstraint("priority_code BETWEEN 1 AND 3", name="ck_tasks_priority_code"),
+        CheckConstraint("status_code BETWEEN 1 AND 2", name="ck_tasks_status_code"),
+    )
+
+
+def upgrade(conn):
+    # 1. Relleno por lotes
+    last_id = conn.scalar(text("SELECT MAX(id) FROM tasks")) or 0
+    for first_id in range(1, last_id + 1, BATCH_SIZE):
+        _fill_codes(conn, first_id, first_id + BATCH_SIZE - 1)
+        conn.commit()
+
+    # 2. NOT NULL en los códigos, nullable en las cadenas
+    columns = {col["name"]: col for col in inspect(conn).get_columns("tasks")}
+    if columns["priority_code"]["nullable"]:
+        if conn.dialect.name in ("mysql", "mariadb"):
+            conn.execute(text(
+                "ALTER TABLE tasks "
+                "MODIFY priority_code TINYINT UNSIGNED NOT NULL, "
+                "MODIFY status_code TINYINT UNSIGNED NOT NULL, "
+                "MODIFY priority VARCHAR(20) NULL, "
+                "MODIFY status VARCHAR(20) NULL, "
+                "LOCK=NONE"
+            ))
+        else:
+            ops.rebuild_table(conn, _sqlite_tasks(conn))
+
+    # 3. Resúmenes
+    if ops.has_table(conn, "user_task_summaries"):
+        conn.execute(text("DELETE FROM user_task_summaries"))
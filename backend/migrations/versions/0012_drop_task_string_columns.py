@@ -0,0 +1,30 @@
+"""Prioridad y estado de las tareas como códigos enteros (fase 3: borrar las cadenas)
+
+Va en una versión posterior a la que dejó de escribir las columnas priority y
+status: las instancias que aún se estén sustituyendo al aplicarla ya solo usan
+priority_code y status_code.
+
+Se borran primero los índices de las cadenas y después las columnas. En
+MariaDB el DROP COLUMN pide LOCK=NONE (reconstruye la tabla en línea).
+"""
+from sqlalchemy import text
+
+from migrations import ops
+
+COLUMNS = ("priority", "status")
+
+
+def upgrade(conn):
+    ops.drop_index(conn, "tasks", "ix_tasks_user_status_due")
+    ops.drop_index(conn, "tasks", "ix_tasks_user_priority")
+
+    existing = [column for column in COLUMNS if ops.has_column(conn, "tasks", column)]
+    if not existing:
+        return
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text(
+            "ALTER TABLE tasks " + ", ".join(f"DROP COLUMN {column}" for column in existing) + ", LOCK=NONE"
+        ))
+    else:
+        for column in existing:
+            conn.execute(text(f"ALTER TABLE tasks DROP COLUMN {column}"))
@@ -1,4 +1,13 @@
 from .user import User
+from .social_account import SocialAccount
 from .task import Task
+from .habits import Habit
+from .habit_history import HabitHistory
+from .user_stats import UserHabitStats
+from .user_data_version import UserDataVersion
+from .deleted_record import DeletedRecord
+from .refresh_token import RefreshToken
+from .revoked_token import RevokedToken
+from .task_summary import UserTaskSummary
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "SocialAccount", "Task", "Habit", "HabitHistory", "UserHabitStats", "UserDataVersion", "DeletedRecord", "RefreshToken", "RevokedToken", "UserTaskSummary"]
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects import mysql
+from datetime import datetime
+
+from models.user import Base
+
+
+class DeletedRecord(Base):
+    """Tombstone de una tarea o hábito borrado, para que /sync pueda informar del borrado."""
+    __tablename__ = "deleted_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    resource = Column(String(20), nullable=False)  # 'task' o 'habit'
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql", "mariadb"),
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_deleted_records_user_deleted", "id_user", "deleted_at"),
+    )
+
+    def __repr__(self):
+        return f"<DeletedRecord(resource={self.resource}, record_id={self.record_id}, id_user={self.id_user})>"
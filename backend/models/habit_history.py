@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship
+
+from models.user import Base
+
+
+class HabitHistory(Base):
+    """Historial de un hábito en un año: bitmap de 46 bytes, un bit por día (ver habits/bitmap.py)."""
+    __tablename__ = "habit_history"
+
+    id_habit = Column(Integer, ForeignKey("habits.id", ondelete="CASCADE"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    bits = Column(LargeBinary(46), nullable=False)
+
+    # Relación con Habit
+    habit = relationship("Habit", back_populates="history")
+
+    def __repr__(self):
+        return f"<HabitHistory(id_habit={self.id_habit}, year={self.year})>"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,14 +16,25 @@ class Habit(Base):
     last_completed_date = Column(Date, nullable=True)    # Última vez que se marcó completado
     color = Column(String(20), nullable=True)            # Color visual del hábito
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Marca de última modificación (microsegundos en MariaDB) para la sincronización delta
+    updated_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql", "mariadb"),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
     id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Relación con User
     user = relationship("User", back_populates="habits")
 
+    # Historial de completados (un bitmap por año)
+    history = relationship("HabitHistory", back_populates="habit", cascade="all, delete-orphan")
+
     # Un mismo usuario no puede tener dos hábitos con el mismo nombre
     __table_args__ = (
         UniqueConstraint("name", "id_user", name="uq_habit_name_user"),
+        Index("ix_habits_user_updated", "id_user", "updated_at"),
     )
 
     def __repr__(self):
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index
+from datetime import datetime
+
+from models.user import Base
+
+
+class RefreshToken(Base):
+    """
+    Refresh token emitido en un login. Cada uso lo rota: se marca como revocado y
+    se emite otro de la misma familia. Presentar uno ya rotado revoca la familia.
+    """
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(String(32), nullable=False)  # jti del primer token de la sesión
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_family", "family_id"),
+        Index("ix_refresh_tokens_user", "user_id"),
+        Index("ix_refresh_tokens_expires", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<RefreshToken(jti={self.jti}, user_id={self.user_id}, revoked={self.revoked_at is not None})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, DateTime, Integer, Index
+
+from models.user import Base
+
+
+class RevokedToken(Base):
+    """
+    jti de un access token revocado antes de caducar (logout). Solo hace falta
+    hasta su `expires_at`; el id creciente permite a cada worker leer solo las
+    revocaciones nuevas.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(32), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, expires_at={self.expires_at})>"
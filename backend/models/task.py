@@ -1,28 +1,91 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Text
+from sqlalchemy import (
+    CheckConstraint, Column, Integer, SmallInteger, String, DateTime, ForeignKey, UniqueConstraint, Text, Index,
+)
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 
 from models.user import Base
 
+# Valores admitidos; el código guardado en la BD es la posición + 1 (no reordenar)
+TASK_PRIORITIES = ("low", "medium", "high")
+TASK_STATUSES = ("pending", "completed")
+
+
+class CodedString(TypeDecorator):
+    """Cadena de un conjunto cerrado guardada como un entero pequeño (TINYINT en MariaDB).
+
+    El ORM y las consultas siguen usando las cadenas: la conversión se hace al
+    enviar parámetros y al leer filas. El CHECK de la tabla limita los códigos.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, choices: tuple[str, ...]):
+        super().__init__()
+        self.choices = choices
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(mysql.TINYINT(unsigned=True))
+        return dialect.type_descriptor(SmallInteger())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.choices.index(value) + 1
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.choices[value - 1]
+
+
+def _check_codes(column: str, choices: tuple[str, ...]) -> CheckConstraint:
+    return CheckConstraint(f"{column} BETWEEN 1 AND {len(choices)}", name=f"ck_tasks_{column}")
+
 
 class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), index=True, nullable=False)
-    priority = Column(String(20), nullable=False)
-    status = Column(String(20), nullable=False)
+    # Guardados como códigos en priority_code y status_code (migraciones 0010 a 0012)
+    priority = Column("priority_code", CodedString(TASK_PRIORITIES), nullable=False)
+    status = Column("status_code", CodedString(TASK_STATUSES), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     due_date = Column(DateTime, nullable=False)
     description = Column(Text, nullable=True)
+    # Marca de última modificación (microsegundos en MariaDB) para la sincronización delta
+    updated_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql", "mariadb"),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
     id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Relacion con User
     user = relationship("User", back_populates="tasks")
 
-    # Un mismo usuario no puede tener dos tareas con el mismo nombre
+    # Un mismo usuario no puede tener dos tareas con el mismo nombre.
+    # priority_code y status_code solo admiten sus códigos.
+    # Índices compuestos para el listado paginado (keyset) y los filtros de GET /tasks
     __table_args__ = (
         UniqueConstraint("name", "id_user", name="uq_task_name_user"),
+        _check_codes("priority_code", TASK_PRIORITIES),
+        _check_codes("status_code", TASK_STATUSES),
+        Index("ix_tasks_user_due_id", "id_user", "due_date", "id"),
+        # También cuenta las vencidas de GET /tasks/summary con un rango por estado
+        Index("ix_tasks_user_status_code_due", "id_user", "status_code", "due_date"),
+        Index("ix_tasks_user_priority_code", "id_user", "priority_code"),
+        Index("ix_tasks_user_updated", "id_user", "updated_at"),
+        # Búsqueda de texto completo (GET /tasks/search). En SQLite la hace la
+        # tabla virtual FTS5 tasks_fts que crea la migración 0008
+        Index(
+            "ft_tasks_name_description", "name", "description", mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect=("mysql", "mariadb")),
     )
 
     def __repr__(self):
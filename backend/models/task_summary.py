@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from models.user import Base
+
+
+class UserTaskSummary(Base):
+    """Contadores de tareas por usuario para GET /tasks/summary, mantenidos en cada escritura."""
+    __tablename__ = "user_task_summaries"
+
+    id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_tasks = Column(Integer, default=0, nullable=False)
+    pending_tasks = Column(Integer, default=0, nullable=False)
+    completed_tasks = Column(Integer, default=0, nullable=False)
+    # Tareas pendientes por prioridad
+    pending_low = Column(Integer, default=0, nullable=False)
+    pending_medium = Column(Integer, default=0, nullable=False)
+    pending_high = Column(Integer, default=0, nullable=False)
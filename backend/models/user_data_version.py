@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from models.user import Base
+
+
+class UserDataVersion(Base):
+    """Versión de los datos de cada usuario: se incrementa en cada escritura y sirve para los ETag."""
+    __tablename__ = "user_data_versions"
+
+    id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tasks_version = Column(Integer, default=0, nullable=False)
+    habits_version = Column(Integer, default=0, nullable=False)  # Cubre /habits y /habits/stats
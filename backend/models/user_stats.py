@@ -9,3 +9,8 @@ class UserHabitStats(Base):
     id_user = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     global_streak = Column(Integer, default=0, nullable=False)
     last_all_completed_date = Column(Date, nullable=True)
+
+    # Contadores incrementales para comprobar el 100% sin recorrer todos los hábitos
+    total_habits = Column(Integer, default=0, nullable=False)
+    completed_today = Column(Integer, default=0, nullable=False)
+    counters_date = Column(Date, nullable=True)  # Día al que corresponde completed_today
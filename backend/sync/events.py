@@ -0,0 +1,83 @@
+"""
+Pub/sub en memoria para notificar cambios a los clientes conectados por SSE.
+
+Los endpoints de escritura publican un evento pequeño (recurso, acción e ids)
+tras el commit y el broker lo reparte a las conexiones abiertas de ese usuario.
+Cada conexión tiene una cola acotada: si un cliente lento la llena, se vacía y
+se le envía un único evento `resync` para que vuelva a pedir /sync en lugar de
+acumular memoria sin límite.
+
+El broker es por proceso: con varios workers de uvicorn cada uno solo reparte
+los cambios hechos en él.
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, Literal
+import asyncio
+
+from config import settings
+
+RESYNC = {"type": "resync"}
+
+
+@dataclass(eq=False)
+class Subscription:
+    user_id: int
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.SSE_QUEUE_SIZE))
+    dropped: int = 0
+
+
+class ChangeBroker:
+    def __init__(self):
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, event: dict):
+        """Entrega el evento a todas las conexiones del usuario sin bloquear nunca"""
+        self.published += 1
+        for subscription in self._subscribers.get(user_id, ()):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Backpressure: descartar lo pendiente y pedir al cliente que resincronice
+                self.overflows += 1
+                subscription.dropped += subscription.queue.qsize()
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(RESYNC)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+broker = ChangeBroker()
+
+
+def publish_change(
+    user_id: int,
+    resource: Literal["task", "habit"],
+    action: Literal["created", "updated", "deleted", "toggled"],
+    ids: Iterable[int],
+):
+    """Publica un cambio ya confirmado en la BD (llamar después del commit)"""
+    ids = list(ids)
+    if ids:
+        broker.publish(user_id, {"type": f"{resource}.{action}", "ids": ids})
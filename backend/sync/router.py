@@ -0,0 +1,149 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import json
+
+from sync.schemas import StreamTokenResponse, SyncResponse
+from sync.events import broker
+from auth.dependencies import get_current_user, get_db, get_stream_payload, get_token_payload
+from auth.revocation import revocations
+from auth.utils import create_stream_token
+from config import settings
+from models.task import Task
+from models.habits import Habit
+from models.deleted_record import DeletedRecord
+from models.user import User
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+EPOCH = datetime(1970, 1, 1)
+
+# Margen hacia atrás al leer cambios: cubre transacciones que empezaron antes
+# del cursor y confirmaron después. Los upserts y borrados son idempotentes,
+# así que recibir algo dos veces no es un problema para el cliente.
+SAFETY_MARGIN = timedelta(seconds=5)
+
+
+def _encode_cursor(moment: datetime) -> str:
+    return str((moment - EPOCH) // timedelta(microseconds=1))
+
+
+def _decode_cursor(cursor: str) -> datetime:
+    try:
+        return EPOCH + timedelta(microseconds=int(cursor))
+    except (ValueError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de sincronización inválido",
+        )
+
+
+@router.get("", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Devuelve solo las tareas y hábitos que cambiaron desde `since`.
+
+    - Sin `since` (o con un cursor más antiguo que los tombstones guardados)
+      devuelve todo con `reset=true`.
+    - La respuesta incluye el `cursor` a usar en la siguiente llamada.
+    """
+    now = datetime.utcnow()
+    response = SyncResponse(cursor=_encode_cursor(now))
+
+    since_at = _decode_cursor(since) if since is not None else None
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    if since_at is None or since_at < now - retention:
+        response.reset = True
+        tasks = await db.execute(select(Task).where(Task.id_user == current_user.id))
+        habits = await db.execute(select(Habit).where(Habit.id_user == current_user.id))
+        response.tasks = tasks.scalars().all()
+        response.habits = habits.scalars().all()
+        return response
+
+    window = since_at - SAFETY_MARGIN
+    tasks = await db.execute(
+        select(Task).where(Task.id_user == current_user.id, Task.updated_at > window)
+    )
+    habits = await db.execute(
+        select(Habit).where(Habit.id_user == current_user.id, Habit.updated_at > window)
+    )
+    deleted = await db.execute(
+        select(DeletedRecord.resource, DeletedRecord.record_id).where(
+            DeletedRecord.id_user == current_user.id,
+            DeletedRecord.deleted_at > window,
+        )
+    )
+
+    response.tasks = tasks.scalars().all()
+    response.habits = habits.scalars().all()
+
+    # Un id que vuelve a existir (SQLite reutiliza ids) cuenta como upsert, no como borrado
+    deleted_tasks, deleted_habits = set(), set()
+    for resource, record_id in deleted.all():
+        (deleted_tasks if resource == "task" else deleted_habits).add(record_id)
+    response.deleted_tasks = sorted(deleted_tasks - {task.id for task in response.tasks})
+    response.deleted_habits = sorted(deleted_habits - {habit.id for habit in response.habits})
+    return response
+
+
+@router.post("/stream-token", response_model=StreamTokenResponse)
+async def stream_token(payload: dict = Depends(get_token_payload)):
+    """Token corto para abrir GET /sync/stream desde EventSource, que no envía cabeceras"""
+    return StreamTokenResponse(
+        stream_token=create_stream_token(payload),
+        expires_in=settings.SSE_TOKEN_EXPIRE_SECONDS,
+    )
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    payload: dict = Depends(get_stream_payload),
+):
+    """Canal Server-Sent Events con los cambios de tareas y hábitos del usuario.
+
+    Se abre con `?token=` de POST /sync/stream-token. Cada evento indica el
+    recurso, la acción y los ids afectados (`task.updated`, `habit.toggled`,
+    ...). Un evento `resync` significa que se perdieron eventos y hay que
+    llamar a /sync. Cuando la sesión del token caduca o se cierra (logout) se
+    envía `expired` y se corta la conexión: el cliente pide otro token y vuelve
+    a conectar.
+    """
+    user_id = payload["user_id"]
+    session_id = payload["sid"]
+    session_expires_at = datetime.utcfromtimestamp(payload["sid_exp"])
+
+    async def event_stream():
+        subscription = broker.subscribe(user_id)
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                remaining = (session_expires_at - datetime.utcnow()).total_seconds()
+                # Revocación: como mucho un latido de retraso
+                if remaining <= 0 or revocations.is_revoked(session_id):
+                    yield "event: expired\ndata: {}\n\n"
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=min(settings.SSE_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from tasks.schemas import TaskResponse
+from habits.schemas import HabitResponse
+
+
+class SyncResponse(BaseModel):
+    cursor: str
+    reset: bool = False  # True: respuesta completa, el cliente debe reemplazar su copia local
+    tasks: list[TaskResponse] = []
+    habits: list[HabitResponse] = []
+    deleted_tasks: list[int] = []
+    deleted_habits: list[int] = []
+
+
+class StreamTokenResponse(BaseModel):
+    stream_token: str  # Para GET /sync/stream?token=...
+    expires_in: int  # Segundos para abrir el canal con él
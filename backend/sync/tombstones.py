@@ -0,0 +1,18 @@
+from typing import Iterable, Literal
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.deleted_record import DeletedRecord
+
+
+async def record_deletions(
+    db: AsyncSession,
+    user_id: int,
+    resource: Literal["task", "habit"],
+    record_ids: Iterable[int],
+):
+    """Guarda los tombstones de los registros borrados (en la misma transacción que el borrado)"""
+    rows = [{"id_user": user_id, "resource": resource, "record_id": record_id} for record_id in record_ids]
+    if rows:
+        await db.execute(insert(DeletedRecord), rows)
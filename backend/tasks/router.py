@@ -1,34 +1,204 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Literal, Optional
+import base64
 
-from tasks.schemas import TaskCreate, TaskUpdate, TaskResponse
+from tasks.schemas import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBatchUpdate,
+    TaskBatchDelete,
+    TaskBatchResult,
+    TaskSummaryResponse,
+    TaskPriority,
+    TaskStatus,
+)
+from tasks.search import search_query, search_terms
+from tasks.summary import apply_summary_changes, load_summary, summary_key
 from auth.dependencies import get_current_user, get_db
+from etags import bump_version, current_etag, etag_headers, not_modified
+from fast_json import columns_for, rows_response
+from sync.tombstones import record_deletions
+from sync.events import publish_change
 from models.task import Task
 from models.user import User
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# Máximo de elementos por petición en los endpoints /tasks/batch
+MAX_BATCH_SIZE = 500
+# Tamaño de página de GET /tasks: por defecto y máximo
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(due_date: datetime, task_id: int) -> str:
+    """Cursor opaco con la posición (due_date, id) de la última tarea de la página."""
+    raw = f"{due_date.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        due_date, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(due_date), int(task_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido",
+        )
+
+
+def _encode_search_cursor(offset: int) -> str:
+    """Cursor opaco con el desplazamiento de la siguiente página de una búsqueda."""
+    return base64.urlsafe_b64encode(f"search|{offset}".encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> int:
+    try:
+        kind, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if kind != "search" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido",
+        )
+
 
 @router.get("", response_model=list[TaskResponse])
 async def list_tasks(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Devuelve las tareas del usuario autenticado ordenadas por (due_date, id).
+
+    - Filtros opcionales: status, priority y rango due_from / due_to.
+    - Paginación por cursor (keyset): páginas de `limit` tareas (100 por
+      defecto, 500 como máximo); si quedan más se devuelve la cabecera
+      `X-Next-Cursor`, que se pasa como `cursor` para pedir la siguiente.
+    - Devuelve ETag; con If-None-Match y sin cambios responde 304 sin consultar las tareas.
+
+    Se leen filas planas y se codifican con orjson (ver fast_json.py).
+    """
+    etag = await current_etag(db, current_user.id, "tasks", request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    headers = etag_headers(etag)
+
+    query = select(*columns_for(Task, TaskResponse)).where(Task.id_user == current_user.id)
+
+    if status_filter is not None:
+        query = query.where(Task.status == status_filter)
+    if priority is not None:
+        query = query.where(Task.priority == priority)
+    if due_from is not None:
+        query = query.where(Task.due_date >= due_from)
+    if due_to is not None:
+        query = query.where(Task.due_date <= due_to)
+
+    if cursor is not None:
+        cursor_due, cursor_id = _decode_cursor(cursor)
+        if order == "asc":
+            query = query.where(or_(
+                Task.due_date > cursor_due,
+                and_(Task.due_date == cursor_due, Task.id > cursor_id),
+            ))
+        else:
+            query = query.where(or_(
+                Task.due_date < cursor_due,
+                and_(Task.due_date == cursor_due, Task.id < cursor_id),
+            ))
+
+    if order == "asc":
+        query = query.order_by(Task.due_date.asc(), Task.id.asc())
+    else:
+        query = query.order_by(Task.due_date.desc(), Task.id.desc())
+
+    # Se pide una fila de más para saber si hay página siguiente
+    result = await db.execute(query.limit(limit + 1))
+    tasks = result.mappings().all()
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(tasks[-1]["due_date"], tasks[-1]["id"])
+    return rows_response(tasks, headers)
+
+
+@router.get("/search", response_model=list[TaskResponse])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Busca en el nombre y la descripción de las tareas del usuario autenticado.
+
+    Todas las palabras de `q` deben aparecer; `palabra*` busca por prefijo. Los resultados van
+    ordenados por relevancia y paginados: si hay más, se devuelve la cabecera
+    `X-Next-Cursor` para pedir la siguiente página. Ver tasks/search.py.
+    """
+    dialect = db.get_bind().dialect.name
+    terms = search_terms(q, dialect)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La búsqueda no contiene palabras válidas",
+        )
+
+    # El orden por relevancia no admite keyset: el cursor guarda el desplazamiento
+    offset = _decode_search_cursor(cursor) if cursor is not None else 0
+    query = search_query(current_user.id, terms, dialect).offset(offset).limit(limit + 1)
+    result = await db.execute(query)
+    tasks = result.mappings().all()
+
+    headers = {}
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers["X-Next-Cursor"] = _encode_search_cursor(offset + limit)
+    return rows_response(tasks, headers)
+
+
+@router.get("/summary", response_model=TaskSummaryResponse)
+async def get_task_summary(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Devuelve todas las tareas del usuario autenticado."""
-    return db.query(Task).filter(Task.id_user == current_user.id).all()
+    """Contadores de las tareas del usuario: por estado, pendientes por prioridad y vencidas.
+
+    Se leen de user_task_summaries más un conteo por índice de las vencidas,
+    sin cargar la lista (ver tasks/summary.py).
+    """
+    return await load_summary(db, current_user.id)
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Crea una nueva tarea para el usuario autenticado."""
-    existing = db.query(Task).filter(
-        Task.name == task_data.name,
-        Task.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Task).where(
+            Task.name == task_data.name,
+            Task.id_user == current_user.id,
+        )
+    )
+    existing = result.scalars().first()
 
     if existing:
         raise HTTPException(
@@ -41,26 +211,200 @@ async def create_task(
         priority=task_data.priority,
         status=task_data.status,
         due_date=task_data.due_date,
+        description=task_data.description,
         id_user=current_user.id,
     )
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await apply_summary_changes(db, current_user.id, added=[summary_key(task_data)])
+    await bump_version(db, current_user.id, "tasks")
+    await db.commit()
+    await db.refresh(new_task)
+    publish_change(current_user.id, "task", "created", [new_task.id])
     return new_task
 
 
+def _check_batch_size(items: list):
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El lote está vacío",
+        )
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {MAX_BATCH_SIZE} tareas por lote",
+        )
+
+
+@router.post("/batch", response_model=list[TaskBatchResult])
+async def create_tasks_batch(
+    items: list[TaskCreate],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Crea varias tareas en una sola transacción.
+
+    Las que chocan con `uq_task_name_user` (o repiten nombre dentro del lote)
+    se devuelven como error y el resto se crea igualmente.
+    """
+    _check_batch_size(items)
+
+    names = {item.name for item in items}
+    result = await db.execute(
+        select(Task.name).where(Task.id_user == current_user.id, Task.name.in_(names))
+    )
+    taken = set(result.scalars().all())
+
+    results: list[TaskBatchResult] = []
+    rows = []
+    for index, item in enumerate(items):
+        if item.name in taken:
+            results.append(TaskBatchResult(
+                index=index, result="error", detail="Ya tienes una tarea con ese nombre",
+            ))
+            continue
+        taken.add(item.name)
+        rows.append({**item.model_dump(), "id_user": current_user.id})
+        results.append(TaskBatchResult(index=index, result="created"))
+
+    if rows:
+        # Un único INSERT con executemany y una sola SELECT para recuperar las filas
+        await db.execute(insert(Task), rows)
+        result = await db.execute(
+            select(Task).where(
+                Task.id_user == current_user.id,
+                Task.name.in_([row["name"] for row in rows]),
+            )
+        )
+        created = {task.name: task for task in result.scalars().all()}
+        await apply_summary_changes(db, current_user.id, added=[summary_key(task) for task in created.values()])
+        await bump_version(db, current_user.id, "tasks")
+        await db.commit()
+
+        for item_result in results:
+            if item_result.result == "created":
+                task = created[items[item_result.index].name]
+                item_result.id = task.id
+                item_result.task = TaskResponse.model_validate(task)
+        publish_change(current_user.id, "task", "created", [task.id for task in created.values()])
+
+    return results
+
+
+@router.patch("/batch", response_model=list[TaskBatchResult])
+async def update_tasks_batch(
+    items: list[TaskBatchUpdate],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Edita varias tareas en una sola transacción (solo las del usuario autenticado)."""
+    _check_batch_size(items)
+
+    ids = {item.id for item in items}
+    new_names = {item.name for item in items if item.name is not None}
+
+    result = await db.execute(
+        select(Task).where(
+            Task.id_user == current_user.id,
+            or_(Task.id.in_(ids), Task.name.in_(new_names)),
+        )
+    )
+    loaded = result.scalars().all()
+    tasks = {task.id: task for task in loaded if task.id in ids}
+    name_owner = {task.name: task.id for task in loaded}
+
+    results: list[TaskBatchResult] = []
+    before, after = [], []
+    for index, item in enumerate(items):
+        task = tasks.get(item.id)
+        if task is None:
+            results.append(TaskBatchResult(
+                index=index, id=item.id, result="error", detail="Tarea no encontrada",
+            ))
+            continue
+
+        changes = item.model_dump(exclude_unset=True, exclude={"id"})
+        new_name = changes.get("name")
+        if new_name is not None and name_owner.get(new_name, task.id) != task.id:
+            results.append(TaskBatchResult(
+                index=index, id=item.id, result="error", detail="Ya tienes una tarea con ese nombre",
+            ))
+            continue
+        if new_name is not None:
+            name_owner[new_name] = task.id
+
+        before.append(summary_key(task))
+        for field, value in changes.items():
+            setattr(task, field, value)
+        after.append(summary_key(task))
+        results.append(TaskBatchResult(index=index, id=task.id, result="updated"))
+
+    if any(item_result.result == "updated" for item_result in results):
+        await apply_summary_changes(db, current_user.id, removed=before, added=after)
+        await bump_version(db, current_user.id, "tasks")
+
+    # El flush agrupa los UPDATE con el mismo conjunto de columnas en un executemany
+    await db.commit()
+
+    for item_result in results:
+        if item_result.result == "updated":
+            item_result.task = TaskResponse.model_validate(tasks[item_result.id])
+    publish_change(
+        current_user.id, "task", "updated",
+        [item_result.id for item_result in results if item_result.result == "updated"],
+    )
+    return results
+
+
+@router.delete("/batch", response_model=list[TaskBatchResult])
+async def delete_tasks_batch(
+    payload: TaskBatchDelete,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Elimina varias tareas con un único DELETE (solo las del usuario autenticado)."""
+    _check_batch_size(payload.ids)
+
+    result = await db.execute(
+        select(Task.id, Task.status, Task.priority)
+        .where(Task.id_user == current_user.id, Task.id.in_(payload.ids))
+    )
+    rows = result.all()
+    found = {row.id for row in rows}
+
+    if found:
+        await db.execute(
+            delete(Task).where(Task.id_user == current_user.id, Task.id.in_(found))
+        )
+        await apply_summary_changes(db, current_user.id, removed=[summary_key(row) for row in rows])
+        await record_deletions(db, current_user.id, "task", found)
+        await bump_version(db, current_user.id, "tasks")
+        await db.commit()
+        publish_change(current_user.id, "task", "deleted", found)
+
+    return [
+        TaskBatchResult(index=index, id=task_id, result="deleted")
+        if task_id in found
+        else TaskBatchResult(index=index, id=task_id, result="error", detail="Tarea no encontrada")
+        for index, task_id in enumerate(payload.ids)
+    ]
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Edita una tarea (solo si pertenece al usuario autenticado)."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Task).where(
+            Task.id == task_id,
+            Task.id_user == current_user.id,
+        )
+    )
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(
@@ -68,11 +412,15 @@ async def update_task(
             detail="Tarea no encontrada",
         )
 
+    before = summary_key(task)
     for field, value in task_data.model_dump(exclude_unset=True).items():
         setattr(task, field, value)
 
-    db.commit()
-    db.refresh(task)
+    await apply_summary_changes(db, current_user.id, removed=[before], added=[summary_key(task)])
+    await bump_version(db, current_user.id, "tasks")
+    await db.commit()
+    await db.refresh(task)
+    publish_change(current_user.id, "task", "updated", [task.id])
     return task
 
 
@@ -80,13 +428,16 @@ async def update_task(
 async def delete_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Elimina una tarea (solo si pertenece al usuario autenticado)."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.id_user == current_user.id,
-    ).first()
+    result = await db.execute(
+        select(Task).where(
+            Task.id == task_id,
+            Task.id_user == current_user.id,
+        )
+    )
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(
@@ -94,5 +445,9 @@ async def delete_task(
             detail="Tarea no encontrada",
         )
 
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await apply_summary_changes(db, current_user.id, removed=[summary_key(task)])
+    await record_deletions(db, current_user.id, "task", [task.id])
+    await bump_version(db, current_user.id, "tasks")
+    await db.commit()
+    publish_change(current_user.id, "task", "deleted", [task.id])
@@ -1,29 +1,43 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
+
+# Mismos valores y orden que TASK_PRIORITIES / TASK_STATUSES de models/task.py,
+# que los guarda como códigos enteros: la API sigue siendo de cadenas
+TaskPriority = Literal["low", "medium", "high"]
+TaskStatus = Literal["pending", "completed"]
 
 
 class TaskCreate(BaseModel):
     name: str
-    priority: str
-    status: str
+    priority: TaskPriority
+    status: TaskStatus
     due_date: datetime
     description: Optional[str] = None
 
 
 class TaskUpdate(BaseModel):
     name: Optional[str] = None
-    priority: Optional[str] = None
-    status: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    status: Optional[TaskStatus] = None
     due_date: Optional[datetime] = None
     description: Optional[str] = None
 
+    # Los campos que no cambian se omiten: null solo borra la descripción, el
+    # resto son columnas NOT NULL
+    @field_validator("name", "priority", "status", "due_date")
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("no puede ser null")
+        return value
+
 
 class TaskResponse(BaseModel):
     id: int
     name: str
-    priority: str
-    status: str
+    priority: TaskPriority
+    status: TaskStatus
     created_at: datetime
     due_date: datetime
     description: Optional[str] = None
@@ -31,3 +45,33 @@ class TaskResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int]
+
+
+class TaskBatchResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    result: Literal["created", "updated", "deleted", "error"]
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+
+class TaskPriorityCounts(BaseModel):
+    low: int
+    medium: int
+    high: int
+
+
+class TaskSummaryResponse(BaseModel):
+    total: int
+    pending: int
+    completed: int
+    overdue: int
+    pending_by_priority: TaskPriorityCounts
@@ -0,0 +1,73 @@
+"""
+Búsqueda de texto completo sobre el nombre y la descripción de las tareas.
+
+- MariaDB: índice FULLTEXT `ft_tasks_name_description` (name, description) y
+  MATCH ... AGAINST en modo booleano; se ordena por relevancia descendente.
+- SQLite (desarrollo local / pruebas): tabla virtual FTS5 `tasks_fts` de
+  contenido externo sobre `tasks`, mantenida por triggers (ver la migración
+  0008), y ranking con bm25(). La columna `owner` lleva el token del usuario
+  ('u<id>') y se exige en la expresión, así que solo se cruzan sus tareas.
+
+En los dos casos la consulta del usuario se parte en palabras, todas
+obligatorias, sin distinguir mayúsculas ni (en SQLite) tildes. Una palabra
+terminada en `*` se busca como prefijo: "compra* pan" encuentra "Comprar el
+pan". Por defecto se busca la palabra completa porque expandir un prefijo
+largo obliga a fusionar las listas de todos los términos que empiezan igual
+(ver benchmarks/task_search.py). Los demás operadores de cada motor no se
+exponen, así que no hace falta escapar nada más. En MariaDB el filtro por
+usuario se aplica sobre las coincidencias del índice FULLTEXT, que es global.
+"""
+import re
+
+from sqlalchemy import Select, column, func, literal_column, select, table
+from sqlalchemy.dialects.mysql import match
+
+from fast_json import columns_for
+from models.task import Task
+from tasks.schemas import TaskResponse
+
+# Máximo de palabras que se pasan al motor por búsqueda
+MAX_TERMS = 8
+# innodb_ft_min_token_size: en MariaDB las palabras más cortas no se indexan
+MYSQL_MIN_TERM_LENGTH = 3
+# Peso del nombre frente a la descripción en el ranking de SQLite
+NAME_WEIGHT = 2.0
+
+_WORD = re.compile(r"(\w+)(\*?)", re.UNICODE)
+
+# Tabla virtual FTS5 (solo SQLite); no es un modelo porque create_all no sabe crearla
+tasks_fts = table("tasks_fts", column("rowid"))
+
+
+def search_terms(query: str, dialect: str) -> list[tuple[str, bool]]:
+    """Palabras de la búsqueda que el índice del dialecto puede encontrar, con su marca de prefijo"""
+    terms = [(word.lower(), bool(star)) for word, star in _WORD.findall(query)]
+    if dialect in ("mysql", "mariadb"):
+        terms = [(word, prefix) for word, prefix in terms if len(word) >= MYSQL_MIN_TERM_LENGTH]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def search_query(user_id: int, terms: list[tuple[str, bool]], dialect: str) -> Select:
+    """SELECT de las tareas del usuario que contienen todas las palabras, por relevancia"""
+    columns = columns_for(Task, TaskResponse)
+
+    if dialect in ("mysql", "mariadb"):
+        against = " ".join(f"+{word}{'*' if prefix else ''}" for word, prefix in terms)
+        relevance = match(Task.name, Task.description, against=against).in_boolean_mode()
+        return (
+            select(*columns)
+            .where(Task.id_user == user_id, relevance)
+            .order_by(relevance.desc(), Task.id.asc())
+        )
+
+    # En FTS5 la columna oculta con el nombre de la tabla es la fila completa (MATCH, bm25)
+    fts = literal_column("tasks_fts")
+    words = " ".join(f'"{word}"{"*" if prefix else ""}' for word, prefix in terms)
+    expression = f"owner:u{user_id} AND {{name description}}: ({words})"
+    return (
+        select(*columns)
+        .join_from(Task, tasks_fts, tasks_fts.c.rowid == Task.id)
+        .where(fts.match(expression), Task.id_user == user_id)
+        # Pesos de bm25 por columna: el nombre cuenta el doble y owner nada
+        .order_by(func.bm25(fts, NAME_WEIGHT, 1.0, 0.0).asc(), Task.id.asc())
+    )
@@ -0,0 +1,205 @@
+"""
+Resumen de tareas por usuario (GET /tasks/summary y /dashboard).
+
+Los contadores por estado y por prioridad viven en user_task_summaries y los
+endpoints de escritura de tasks/router.py los ajustan en su misma transacción
+con un único UPDATE col = col + delta, así que leerlos cuesta una lectura por
+clave primaria tenga el usuario las tareas que tenga. Si el usuario aún no
+tiene fila (usuarios anteriores a la tabla o cargados en bloque), se calcula
+con una consulta agregada la primera vez que se necesita.
+
+Las vencidas dependen de la hora, no de las escrituras, así que se cuentan al
+pedir el resumen con un rango del índice ix_tasks_user_status_due
+(id_user, status='pending', due_date < ahora). Igual que en el frontend, una
+tarea "solo fecha" (medianoche UTC) no vence hasta que acaba su día.
+
+Si los contadores se desvían (escrituras hechas fuera de la API), se
+recalculan todos desde cero con:
+
+    python -m tasks.summary
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+import asyncio
+import time
+
+from sqlalchemy import and_, case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import begin_write
+from models.task import Task
+from models.task_summary import UserTaskSummary
+
+STATUS_PENDING = "pending"
+STATUS_COMPLETED = "completed"
+PRIORITY_COLUMNS = {"low": "pending_low", "medium": "pending_medium", "high": "pending_high"}
+
+TaskKey = tuple[str, str]  # (status, priority): lo único de una tarea que afecta al resumen
+
+
+def summary_key(task) -> TaskKey:
+    """Clave de resumen de una tarea (objeto del ORM o fila)"""
+    return task.status, task.priority
+
+
+def _counters(key: TaskKey) -> list[str]:
+    status, priority = key
+    if status == STATUS_COMPLETED:
+        return ["total_tasks", "completed_tasks"]
+    if status != STATUS_PENDING:
+        return ["total_tasks"]
+    counters = ["total_tasks", "pending_tasks"]
+    if priority in PRIORITY_COLUMNS:
+        counters.append(PRIORITY_COLUMNS[priority])
+    return counters
+
+
+def summary_deltas(removed: Iterable[TaskKey] = (), added: Iterable[TaskKey] = ()) -> dict[str, int]:
+    """Cambio neto de cada contador al quitar unas tareas y añadir otras"""
+    deltas: Counter = Counter()
+    for key in removed:
+        deltas.subtract(_counters(key))
+    for key in added:
+        deltas.update(_counters(key))
+    return {column: delta for column, delta in deltas.items() if delta}
+
+
+def _count_columns() -> list:
+    pending = Task.status == STATUS_PENDING
+    return [
+        func.count().label("total_tasks"),
+        func.count(case((pending, 1))).label("pending_tasks"),
+        func.count(case((Task.status == STATUS_COMPLETED, 1))).label("completed_tasks"),
+        *(
+            func.count(case((and_(pending, Task.priority == priority), 1))).label(column)
+            for priority, column in PRIORITY_COLUMNS.items()
+        ),
+    ]
+
+
+async def _count_tasks(db: AsyncSession, user_id: int) -> dict:
+    result = await db.execute(select(*_count_columns()).where(Task.id_user == user_id))
+    return dict(result.mappings().one())
+
+
+async def apply_summary_changes(
+    db: AsyncSession,
+    user_id: int,
+    removed: Iterable[TaskKey] = (),
+    added: Iterable[TaskKey] = (),
+):
+    """
+    Ajusta el resumen del usuario (llamar antes del commit de la escritura)
+
+    Args:
+        removed: Claves de las tareas borradas o de su estado anterior
+        added: Claves de las tareas creadas o de su estado nuevo
+    """
+    deltas = summary_deltas(removed, added)
+    if not deltas:
+        return
+
+    increment = (
+        update(UserTaskSummary)
+        .where(UserTaskSummary.id_user == user_id)
+        .values({getattr(UserTaskSummary, column): getattr(UserTaskSummary, column) + delta
+                 for column, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(increment)
+    if result.rowcount:
+        return
+
+    # Sin fila todavía: se cuenta desde cero, ya con los cambios de esta transacción
+    await db.flush()
+    try:
+        async with db.begin_nested():
+            db.add(UserTaskSummary(id_user=user_id, **await _count_tasks(db, user_id)))
+    except IntegrityError:
+        # Otra petición la creó a la vez (sin ver estos cambios): aplicarlos encima
+        await db.execute(increment)
+
+
+def _overdue_condition(now: datetime):
+    # Las tareas "solo fecha" de hoy están a medianoche UTC y aún no han vencido
+    return and_(Task.due_date < now, Task.due_date != datetime.combine(now.date(), datetime.min.time()))
+
+
+async def load_summary(db: AsyncSession, user_id: int, now: Optional[datetime] = None) -> dict:
+    """
+    Resumen de las tareas del usuario
+
+    Returns:
+        Campos de TaskSummaryResponse
+    """
+    now = now or datetime.utcnow()
+    result = await db.execute(select(UserTaskSummary).where(UserTaskSummary.id_user == user_id))
+    summary = result.scalars().first()
+    if summary is None:
+        # GET que escribe: cerrar la lectura y recontar dentro de una transacción de escritura
+        await db.commit()
+        await begin_write(db)
+        counts = await _count_tasks(db, user_id)
+        try:
+            async with db.begin_nested():
+                db.add(UserTaskSummary(id_user=user_id, **counts))
+        except IntegrityError:
+            pass  # Otra petición la creó a la vez
+        await db.commit()
+    else:
+        counts = {column.name: getattr(summary, column.name) for column in UserTaskSummary.__table__.columns}
+
+    overdue = await db.scalar(
+        select(func.count()).select_from(Task).where(
+            Task.id_user == user_id,
+            Task.status == STATUS_PENDING,
+            _overdue_condition(now),
+        )
+    )
+    return {
+        "total": counts["total_tasks"],
+        "pending": counts["pending_tasks"],
+        "completed": counts["completed_tasks"],
+        "overdue": overdue,
+        "pending_by_priority": {
+            priority: counts[column] for priority, column in PRIORITY_COLUMNS.items()
+        },
+    }
+
+
+async def rebuild_summaries(db: AsyncSession) -> dict:
+    """
+    Recalcula desde cero el resumen de todos los usuarios con un INSERT ... SELECT agrupado
+
+    Returns:
+        Informe con las filas reconstruidas y el tiempo empleado
+    """
+    start = time.perf_counter()
+    await db.execute(delete(UserTaskSummary))
+    count_columns = _count_columns()
+    counts = select(Task.id_user, *count_columns).group_by(Task.id_user)
+    result = await db.execute(
+        insert(UserTaskSummary).from_select(["id_user", *(column.name for column in count_columns)], counts)
+    )
+    await db.commit()
+    return {
+        "summaries_rebuilt": result.rowcount,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+async def _run():
+    from database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        report = await rebuild_summaries(db)
+    await engine.dispose()
+
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_run())
@@ -0,0 +1,50 @@
+"""
+Configuración común de los tests: una BD SQLite temporal con las migraciones
+aplicadas y un cliente HTTP contra la app en memoria (sin levantar uvicorn).
+
+DATABASE_URL se fija antes de importar la app porque database.py crea el
+motor al importarse.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.sqlite')}"
+
+import asyncio  # noqa: E402
+import uuid  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+from migrations.runner import upgrade  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    async def migrate():
+        await upgrade(engine)
+        await engine.dispose()
+
+    asyncio.run(migrate())
+
+
+def api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30)
+
+
+async def auth_headers(client: httpx.AsyncClient) -> dict:
+    """Registra un usuario nuevo y devuelve la cabecera con su access token"""
+    username = f"user_{uuid.uuid4().hex[:8]}"
+    password = "Secret123!"
+    response = await client.post("/auth/register", json={
+        "email": f"{username}@example.com",
+        "username": username,
+        "full_name": username,
+        "password": password,
+    })
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,88 @@
+"""
+Rachas sobre el historial en bitmap (habits/bitmap.py): día de cortesía, cambio
+de año, 29 de febrero y desmarcar el último día.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from habits.bitmap import Timeline, empty_year, set_day
+
+
+def timeline(*days: date, unset: tuple[date, ...] = ()) -> Timeline:
+    years: dict[int, bytes] = {}
+    for day, completed in [(day, True) for day in days] + [(day, False) for day in unset]:
+        years[day.year] = set_day(years.get(day.year, empty_year()), day, completed)
+    return Timeline(years)
+
+
+def test_consecutive_days():
+    days = [date(2023, 5, 1) + timedelta(days=i) for i in range(3)]
+    assert timeline(*days).streak_ending(days[-1]) == 3
+
+
+def test_day_not_completed_has_no_streak():
+    assert timeline(date(2023, 5, 1)).streak_ending(date(2023, 5, 2)) == 0
+
+
+@pytest.mark.parametrize("gap, expected", [(1, 4), (2, 2)])
+def test_grace_day_fills_only_one_day_gaps(gap, expected):
+    # Dos días, `gap` días sin completar y otros dos: solo se salta un hueco de un día
+    start = date(2023, 5, 1)
+    days = [start, start + timedelta(days=1)]
+    days += [days[-1] + timedelta(days=gap + 1), days[-1] + timedelta(days=gap + 2)]
+    assert timeline(*days).streak_ending(days[-1]) == expected
+
+
+def test_grace_day_is_not_counted():
+    days = [date(2023, 5, 1), date(2023, 5, 3)]
+    assert timeline(*days).streak_ending(days[-1]) == 2
+
+
+def test_streak_crosses_new_year():
+    days = [date(2023, 12, 30), date(2023, 12, 31), date(2024, 1, 1)]
+    assert timeline(*days).streak_ending(date(2024, 1, 1)) == 3
+
+
+def test_grace_day_on_new_year():
+    days = [date(2023, 12, 30), date(2023, 12, 31), date(2024, 1, 2)]
+    assert timeline(*days).streak_ending(date(2024, 1, 2)) == 3
+
+
+def test_year_without_history_breaks_the_streak():
+    days = [date(2022, 12, 31), date(2024, 1, 1)]
+    assert timeline(*days).streak_ending(date(2024, 1, 1)) == 1
+
+
+@pytest.mark.parametrize("days", [
+    [date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1)],
+    [date(2023, 2, 27), date(2023, 2, 28), date(2023, 3, 1)],
+])
+def test_end_of_february(days):
+    assert timeline(*days).streak_ending(days[-1]) == 3
+
+
+def test_leap_year_offsets_the_next_year():
+    # 2024 tiene 366 días: el 1 de enero de 2025 va justo después del 31 de diciembre
+    days = [date(2024, 2, 29), date(2024, 12, 31), date(2025, 1, 1)]
+    assert timeline(*days).streak_ending(date(2025, 1, 1)) == 2
+
+
+def test_untoggle_last_day():
+    days = [date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 3)]
+    history = timeline(*days, unset=(days[-1],))
+
+    assert history.last_completed(days[-1]) == days[1]
+    assert history.streak_ending(days[-1]) == 0
+    assert history.streak_ending(days[1]) == 2
+
+
+def test_last_completed():
+    days = [date(2023, 12, 31), date(2024, 1, 5)]
+    history = timeline(*days)
+
+    assert history.last_completed(date(2024, 1, 4)) == date(2023, 12, 31)
+    assert history.last_completed(date(2024, 2, 1)) == date(2024, 1, 5)
+    assert history.last_completed(date(2023, 1, 1)) is None
+    assert history.last_completed(date(2022, 6, 1)) is None
+    assert Timeline({}).last_completed(date(2024, 1, 1)) is None
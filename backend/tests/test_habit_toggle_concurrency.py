@@ -0,0 +1,59 @@
+"""
+Toggles simultáneos del mismo hábito (móvil + navegador a la vez): el estado
+final de cada hábito, los contadores de user_habit_stats y la racha global
+tienen que coincidir con lo que daría aplicarlos uno detrás de otro.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, engine
+from models.user_stats import UserHabitStats
+from tests.conftest import api_client, auth_headers
+
+HABITS = 4
+
+
+@pytest.mark.parametrize("toggles", [9, 10])
+def test_concurrent_toggles_keep_counters_consistent(toggles):
+    async def scenario():
+        async with api_client() as client:
+            headers = await auth_headers(client)
+            habit_ids = []
+            for i in range(HABITS):
+                response = await client.post("/habits", json={"name": f"h{i}", "goal": 30}, headers=headers)
+                assert response.status_code == 201, response.text
+                habit_ids.append(response.json()["id"])
+
+            responses = await asyncio.gather(*(
+                client.post(f"/habits/{habit_id}/toggle", headers=headers)
+                for habit_id in habit_ids
+                for _ in range(toggles)
+            ))
+            assert [r.status_code for r in responses] == [200] * len(responses)
+
+            habits = (await client.get("/habits", headers=headers)).json()
+            stats = (await client.get("/habits/stats", headers=headers)).json()
+            user_id = habits[0]["id_user"]
+
+        async with AsyncSessionLocal() as db:
+            counters = (await db.execute(
+                select(UserHabitStats).where(UserHabitStats.id_user == user_id)
+            )).scalars().one()
+        await engine.dispose()
+        return habits, stats, counters
+
+    habits, stats, counters = asyncio.run(scenario())
+
+    # Un número impar de toggles deja el hábito completado hoy
+    done = toggles % 2 == 1
+    today = date.today().isoformat()
+    for habit in habits:
+        assert (habit["last_completed_date"] == today) == done, habit
+        assert habit["streak"] == int(done), habit
+
+    assert counters.total_habits == HABITS
+    assert counters.completed_today == (HABITS if done else 0)
+    assert stats["global_streak"] == int(done)
@@ -0,0 +1,37 @@
+"""
+Pool de hashing (auth/utils.py): una petición cancelada (cliente desconectado)
+no libera su plaza hasta que el hilo de bcrypt termina de verdad.
+"""
+import asyncio
+import threading
+
+from auth.utils import _run_in_hash_pool, get_hash_pool_metrics
+
+
+def test_cancelled_request_keeps_its_slot_until_the_thread_ends():
+    async def scenario():
+        started, finish = threading.Event(), threading.Event()
+
+        def slow_hash():
+            started.set()
+            finish.wait(5)
+
+        pending_before = get_hash_pool_metrics()["pending"]
+        request = asyncio.create_task(_run_in_hash_pool(slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        request.cancel()
+        await asyncio.sleep(0.05)
+        while_running = get_hash_pool_metrics()["pending"] - pending_before
+
+        finish.set()
+        for _ in range(100):
+            if get_hash_pool_metrics()["pending"] == pending_before:
+                break
+            await asyncio.sleep(0.01)
+        return request.cancelled(), while_running, get_hash_pool_metrics()["pending"] - pending_before
+
+    cancelled, while_running, after = asyncio.run(scenario())
+
+    assert cancelled
+    assert while_running == 1
+    assert after == 0
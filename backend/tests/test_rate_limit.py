@@ -0,0 +1,28 @@
+"""
+Token bucket en memoria (auth/rate_limit.py): ráfaga, Retry-After y límites
+mal configurados.
+"""
+import asyncio
+
+import pytest
+
+from auth.rate_limit import MemoryRateLimitBackend, RateLimit
+
+
+def test_burst_then_retry_after():
+    async def scenario():
+        backend = MemoryRateLimitBackend(max_keys=10)
+        limit = RateLimit(burst=2, per_minute=6)
+        return [await backend.hit("ip:1", limit) for _ in range(3)]
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first == second == 0
+    # Sin fichas: falta casi una ficha entera, que a 6 por minuto son ~10 s
+    assert 9 < third <= 10
+
+
+@pytest.mark.parametrize("per_minute", [0, -1])
+def test_rate_must_be_positive(per_minute):
+    with pytest.raises(ValueError):
+        RateLimit(burst=5, per_minute=per_minute)
@@ -0,0 +1,41 @@
+"""
+Sincronización de la lista de revocados entre workers: una fila con un id más
+bajo que otra ya leída (su commit llegó después) también se recoge.
+"""
+import asyncio
+from datetime import datetime, timedelta
+import uuid
+
+from sqlalchemy import func, insert, select
+
+from auth.revocation import RevocationList
+from database import AsyncSessionLocal, engine
+from models.revoked_token import RevokedToken
+
+
+def test_sync_picks_up_rows_committed_out_of_order():
+    async def scenario():
+        revoked = RevocationList(capacity=100, fp_rate=0.01)
+        await revoked.load()
+        expires_at = datetime.utcnow() + timedelta(minutes=15)
+        early, late = uuid.uuid4().hex, uuid.uuid4().hex
+
+        async with AsyncSessionLocal() as db:
+            first_id = (await db.scalar(select(func.max(RevokedToken.id))) or 0) + 1
+            # El id siguiente se queda reservado para una transacción que aún no ha hecho commit
+            await db.execute(insert(RevokedToken).values(id=first_id + 1, jti=late, expires_at=expires_at))
+            await db.commit()
+            await revoked.sync()
+            seen_before_commit = revoked.is_revoked(early)
+
+            await db.execute(insert(RevokedToken).values(id=first_id, jti=early, expires_at=expires_at))
+            await db.commit()
+        await revoked.sync()
+        await engine.dispose()
+        return seen_before_commit, revoked.is_revoked(early), revoked.is_revoked(late)
+
+    seen_before_commit, early_revoked, late_revoked = asyncio.run(scenario())
+
+    assert not seen_before_commit
+    assert early_revoked
+    assert late_revoked
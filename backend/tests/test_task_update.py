@@ -0,0 +1,53 @@
+"""
+Ediciones de tareas con campos a null: solo la descripción se puede borrar,
+el resto son columnas NOT NULL y se rechazan con 422 sin tocar la tarea ni el
+resumen.
+"""
+import asyncio
+
+import pytest
+
+from database import engine
+from tests.conftest import api_client, auth_headers
+
+TASK = {"name": "t", "priority": "high", "status": "pending", "due_date": "2030-01-01T00:00:00"}
+
+
+@pytest.mark.parametrize("field", ["name", "priority", "status", "due_date"])
+def test_null_fields_are_rejected(field):
+    async def scenario():
+        async with api_client() as client:
+            headers = await auth_headers(client)
+            response = await client.post("/tasks", json=TASK, headers=headers)
+            assert response.status_code == 201, response.text
+            task_id = response.json()["id"]
+
+            single = await client.put(f"/tasks/{task_id}", json={field: None}, headers=headers)
+            batch = await client.patch("/tasks/batch", json=[{"id": task_id, field: None}], headers=headers)
+            task, = (await client.get("/tasks", headers=headers)).json()
+            summary = (await client.get("/tasks/summary", headers=headers)).json()
+        await engine.dispose()
+        return single, batch, task, summary
+
+    single, batch, task, summary = asyncio.run(scenario())
+
+    assert single.status_code == 422, single.text
+    assert batch.status_code == 422, batch.text
+    assert {key: task[key] for key in TASK} == TASK
+    assert summary["pending_by_priority"]["high"] == 1
+
+
+def test_null_description_clears_it():
+    async def scenario():
+        async with api_client() as client:
+            headers = await auth_headers(client)
+            response = await client.post("/tasks", json={**TASK, "description": "algo"}, headers=headers)
+            task_id = response.json()["id"]
+            response = await client.put(f"/tasks/{task_id}", json={"description": None}, headers=headers)
+        await engine.dispose()
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200, response.text
+    assert response.json()["description"] is None
@@ -6,8 +6,16 @@ import {
     type ReactNode,
 } from "react";
 
-// Configuración de la API
-const API_URL = "http://localhost:8000";
+import {
+    API_URL,
+    apiFetch,
+    clearTokens,
+    getAccessToken,
+    onTokensChange,
+    refreshTokens,
+    saveTokens,
+    tokenExpiresAt,
+} from "@/lib/api";
 
 // Tipo para cuenta social
 type SocialAccount = {
@@ -60,36 +68,34 @@ const AuthContext = createContext<AuthContextType | undefined>(undefined);
 export const AuthContextProvider = ({ children }: AuthProviderProps) => {
     const [user, setUser] = useState<User | null>(null);
     const [loading, setLoading] = useState(true);
+    // Caducidad (ms) del access token guardado; cambia con cada token nuevo
+    const [tokenExp, setTokenExp] = useState<number | null>(() => {
+        const token = getAccessToken();
+        return token ? tokenExpiresAt(token) : null;
+    });
 
     // Función para verificar si hay un usuario autenticado
     const checkAuth = async () => {
-        const token = localStorage.getItem("access_token");
-
-        if (!token) {
+        if (!getAccessToken()) {
             setLoading(false);
             return;
         }
 
         try {
-            const response = await fetch(`${API_URL}/auth/me`, {
-                method: "GET",
-                headers: {
-                    Authorization: `Bearer ${token}`,
-                    "Content-Type": "application/json",
-                },
-            });
+            // Si el access token ha caducado, apiFetch lo renueva y reintenta
+            const response = await apiFetch("/auth/me");
 
             if (response.ok) {
                 const userData = await response.json();
                 setUser(userData);
             } else {
                 // Token inválido o expirado
-                localStorage.removeItem("access_token");
+                clearTokens();
                 setUser(null);
             }
         } catch (error) {
             console.error("Error checking auth:", error);
-            localStorage.removeItem("access_token");
+            clearTokens();
             setUser(null);
         } finally {
             setLoading(false);
@@ -152,8 +158,8 @@ export const AuthContextProvider = ({ children }: AuthProviderProps) => {
                 };
             }
 
-            // Guardar token en localStorage
-            localStorage.setItem("access_token", data.access_token);
+            // Guardar tokens en localStorage
+            saveTokens(data);
 
             // Actualizar estado del usuario
             setUser(data.user);
@@ -174,7 +180,20 @@ export const AuthContextProvider = ({ children }: AuthProviderProps) => {
 
     // Log Out
     const logOut = () => {
-        localStorage.removeItem("access_token");
+        const token = getAccessToken();
+        const refreshToken = localStorage.getItem("refresh_token");
+        // Revocar la sesión en el backend (si falla, los tokens caducan solos)
+        if (token) {
+            fetch(`${API_URL}/auth/logout`, {
+                method: "POST",
+                headers: {
+                    Authorization: `Bearer ${token}`,
+                    "Content-Type": "application/json",
+                },
+                body: JSON.stringify({ refresh_token: refreshToken }),
+            }).catch((error) => console.error("Error logging out:", error));
+        }
+        clearTokens();
         setUser(null);
         console.log("Logout exitoso");
     };
@@ -199,8 +218,8 @@ export const AuthContextProvider = ({ children }: AuthProviderProps) => {
                 };
             }
 
-            // Guardar token en localStorage
-            localStorage.setItem("access_token", data.access_token);
+            // Guardar tokens en localStorage
+            saveTokens(data);
 
             // Actualizar estado del usuario
             setUser(data.user);
@@ -216,11 +235,33 @@ export const AuthContextProvider = ({ children }: AuthProviderProps) => {
         }
     };
 
+    // Seguir los tokens que guarda cualquier parte de la app (login, renovaciones de apiFetch)
+    useEffect(
+        () =>
+            onTokensChange((token) => {
+                setTokenExp(token ? tokenExpiresAt(token) : null);
+                if (!token) setUser(null);
+            }),
+        []
+    );
+
     // Verificar autenticación al montar el componente
     useEffect(() => {
         checkAuth();
     }, []);
 
+    // Renovar el access token un minuto antes de que caduque. Cada token nuevo
+    // trae otro exp, así que el temporizador se vuelve a programar tras cada
+    // renovación y también al recargar la página.
+    useEffect(() => {
+        if (!user || !tokenExp) return;
+        const timer = setTimeout(() => {
+            // Si falla con 401, refreshTokens borra los tokens y se cierra la sesión
+            refreshTokens();
+        }, Math.max(tokenExp - Date.now() - 60_000, 10_000));
+        return () => clearTimeout(timer);
+    }, [user, tokenExp]);
+
     return (
         <AuthContext.Provider
             value={{
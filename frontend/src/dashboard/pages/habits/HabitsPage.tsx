@@ -2,6 +2,7 @@ import { useEffect, useState } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Plus, Flame, CheckCircle2, Target, Pencil, Trash2, Loader2 } from "lucide-react";
+import { apiFetch, openChangeStream } from "@/lib/api";
 
 interface Habit {
   id: number;
@@ -62,11 +63,6 @@ const getHabitRisk = (habit: Habit): RiskStatus => {
 const getProgress = (streak: number, goal: number) =>
   Math.min(100, Math.round((streak / goal) * 100));
 
-const getAuthHeaders = () => ({
-  "Content-Type": "application/json",
-  Authorization: `Bearer ${localStorage.getItem("access_token")}`,
-});
-
 type FilterType = "all" | "pending" | "completed";
 
 export const HabitsPage = () => {
@@ -100,7 +96,7 @@ export const HabitsPage = () => {
 
   const fetchStats = async () => {
     try {
-      const res = await fetch("http://localhost:8000/habits/stats", { headers: getAuthHeaders() });
+      const res = await apiFetch("/habits/stats");
       if (!res.ok) return;
       const data = await res.json();
       setGlobalStreak(data.global_streak);
@@ -109,12 +105,12 @@ export const HabitsPage = () => {
     }
   };
 
-  const fetchHabits = async () => {
-    setLoading(true);
+  const fetchHabits = async (showLoading = true) => {
+    if (showLoading) setLoading(true);
     try {
       const [habitsRes, statsRes] = await Promise.all([
-        fetch("http://localhost:8000/habits",       { headers: getAuthHeaders() }),
-        fetch("http://localhost:8000/habits/stats", { headers: getAuthHeaders() }),
+        apiFetch("/habits"),
+        apiFetch("/habits/stats"),
       ]);
       if (habitsRes.ok) setHabits(await habitsRes.json());
       if (statsRes.ok) {
@@ -132,9 +128,8 @@ export const HabitsPage = () => {
     if (!createName.trim() || !createGoal) return;
     setCreateLoading(true);
     try {
-      const res = await fetch("http://localhost:8000/habits", {
+      const res = await apiFetch("/habits", {
         method: "POST",
-        headers: getAuthHeaders(),
         body: JSON.stringify({ name: createName.trim(), goal: parseInt(createGoal), color: createColor }),
       });
       if (!res.ok) {
@@ -156,9 +151,8 @@ export const HabitsPage = () => {
     if (!editingHabit || !editName.trim() || !editGoal) return;
     setEditLoading(true);
     try {
-      const res = await fetch(`http://localhost:8000/habits/${editingHabit.id}`, {
+      const res = await apiFetch(`/habits/${editingHabit.id}`, {
         method: "PUT",
-        headers: getAuthHeaders(),
         body: JSON.stringify({ name: editName.trim(), goal: parseInt(editGoal), color: editColor }),
       });
       if (!res.ok) {
@@ -180,10 +174,7 @@ export const HabitsPage = () => {
     if (!editingHabit) return;
     setDeleteLoading(true);
     try {
-      const res = await fetch(`http://localhost:8000/habits/${editingHabit.id}`, {
-        method: "DELETE",
-        headers: getAuthHeaders(),
-      });
+      const res = await apiFetch(`/habits/${editingHabit.id}`, { method: "DELETE" });
       if (!res.ok) throw new Error();
       setHabits((prev) => prev.filter((h) => h.id !== editingHabit.id));
       closeEditModal();
@@ -197,10 +188,7 @@ export const HabitsPage = () => {
   const toggleHabit = async (id: number) => {
     setTogglingIds((prev) => new Set(prev).add(id));
     try {
-      const res = await fetch(`http://localhost:8000/habits/${id}/toggle`, {
-        method: "POST",
-        headers: getAuthHeaders(),
-      });
+      const res = await apiFetch(`/habits/${id}/toggle`, { method: "POST" });
       if (!res.ok) throw new Error();
       const updated = await res.json();
       setHabits((prev) => prev.map((h) => (h.id === updated.id ? updated : h)));
@@ -235,6 +223,9 @@ export const HabitsPage = () => {
 
   useEffect(() => { fetchHabits(); }, []);
 
+  // Cambios hechos desde otra pestaña o dispositivo
+  useEffect(() => openChangeStream("habit", () => fetchHabits(false)), []);
+
   // ─── Stats ──────────────────────────────────────────────────────────────────
 
   const completedTodayCount = habits.filter((h) => isCompletedToday(h.last_completed_date)).length;
@@ -5,8 +5,7 @@ import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Plus, Circle, Clock, AlertCircle, Trash2, X, ChevronDown, Pencil } from "lucide-react";
 import { useState, useEffect } from "react";
-
-const API_URL = "http://localhost:8000";
+import { apiFetch, openChangeStream } from "@/lib/api";
 
 interface Task {
     id: number;
@@ -23,6 +22,9 @@ type SortBy = "date" | "priority";
 
 const PRIORITY_ORDER: Record<string, number> = { high: 0, medium: 1, low: 2 };
 
+// Tareas por página al cargar la lista (máximo del backend)
+const TASKS_PAGE_SIZE = 500;
+
 export const TaskPage = () => {
     // Server state — last saved version
     const [serverTasks, setServerTasks] = useState<Task[]>([]);
@@ -60,17 +62,21 @@ export const TaskPage = () => {
 
     const hasChanges = localChanges.size > 0;
 
-    // ── Auth helper ────────────────────────────────────────────────
-    const getAuthHeaders = () => ({
-        "Content-Type": "application/json",
-        Authorization: `Bearer ${localStorage.getItem("access_token")}`,
-    });
-
     // ── Fetch ──────────────────────────────────────────────────────
+    // El backend pagina GET /tasks: se siguen las páginas con X-Next-Cursor hasta tenerlas todas
     const fetchTasks = async () => {
         try {
-            const res = await fetch(`${API_URL}/tasks`, { headers: getAuthHeaders() });
-            if (res.ok) setServerTasks(await res.json());
+            const all: Task[] = [];
+            let cursor: string | null = null;
+            do {
+                const params = new URLSearchParams({ limit: String(TASKS_PAGE_SIZE) });
+                if (cursor) params.set("cursor", cursor);
+                const res = await apiFetch(`/tasks?${params}`);
+                if (!res.ok) return;
+                all.push(...(await res.json()));
+                cursor = res.headers.get("X-Next-Cursor");
+            } while (cursor);
+            setServerTasks(all);
         } catch (err) {
             console.error("Error fetching tasks:", err);
         } finally {
@@ -80,6 +86,9 @@ export const TaskPage = () => {
 
     useEffect(() => { fetchTasks(); }, []);
 
+    // Cambios hechos desde otra pestaña o dispositivo
+    useEffect(() => openChangeStream("task", fetchTasks), []);
+
     // ── Toggle status (local only, not saved yet) ──────────────────
     const handleToggleStatus = (task: Task) => {
         const current = localChanges.get(task.id) ?? task.status;
@@ -103,9 +112,8 @@ export const TaskPage = () => {
         try {
             await Promise.all(
                 Array.from(localChanges.entries()).map(([id, status]) =>
-                    fetch(`${API_URL}/tasks/${id}`, {
+                    apiFetch(`/tasks/${id}`, {
                         method: "PUT",
-                        headers: getAuthHeaders(),
                         body: JSON.stringify({ status }),
                     })
                 )
@@ -126,9 +134,8 @@ export const TaskPage = () => {
         if (!newName.trim() || !newDueDate) return;
         setCreating(true);
         try {
-            const res = await fetch(`${API_URL}/tasks`, {
+            const res = await apiFetch("/tasks", {
                 method: "POST",
-                headers: getAuthHeaders(),
                 body: JSON.stringify({
                     name: newName.trim(),
                     priority: newPriority,
@@ -159,10 +166,7 @@ export const TaskPage = () => {
     // ── Delete task (immediate) ────────────────────────────────────
     const handleDeleteTask = async (taskId: number) => {
         try {
-            const res = await fetch(`${API_URL}/tasks/${taskId}`, {
-                method: "DELETE",
-                headers: getAuthHeaders(),
-            });
+            const res = await apiFetch(`/tasks/${taskId}`, { method: "DELETE" });
             if (res.status === 204) {
                 setServerTasks(prev => prev.filter(t => t.id !== taskId));
                 setLocalChanges(prev => {
@@ -193,9 +197,8 @@ export const TaskPage = () => {
         if (!editingTask || !editName.trim() || !editDueDate) return;
         setUpdating(true);
         try {
-            const res = await fetch(`${API_URL}/tasks/${editingTask.id}`, {
+            const res = await apiFetch(`/tasks/${editingTask.id}`, {
                 method: "PUT",
-                headers: getAuthHeaders(),
                 body: JSON.stringify({
                     name: editName.trim(),
                     description: editDescription.trim() || null,
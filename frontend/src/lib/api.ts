@@ -0,0 +1,147 @@
+// Cliente de la API compartido: tokens de sesión, renovación y fetch autenticado
+
+export const API_URL = "http://localhost:8000";
+
+export type TokenPair = {
+    access_token: string;
+    refresh_token: string;
+    expires_in: number;
+};
+
+type TokenListener = (accessToken: string | null) => void;
+
+const listeners = new Set<TokenListener>();
+
+// Avisar de cada cambio de tokens (login, renovación o cierre de sesión)
+export const onTokensChange = (listener: TokenListener) => {
+    listeners.add(listener);
+    return () => {
+        listeners.delete(listener);
+    };
+};
+
+export const getAccessToken = () => localStorage.getItem("access_token");
+
+// Guardar el par de tokens devuelto por login, Google o refresh
+export const saveTokens = (data: TokenPair) => {
+    localStorage.setItem("access_token", data.access_token);
+    localStorage.setItem("refresh_token", data.refresh_token);
+    listeners.forEach((listener) => listener(data.access_token));
+};
+
+export const clearTokens = () => {
+    localStorage.removeItem("access_token");
+    localStorage.removeItem("refresh_token");
+    listeners.forEach((listener) => listener(null));
+};
+
+// Instante (ms) en que caduca un access token, según su claim exp
+export const tokenExpiresAt = (token: string): number | null => {
+    try {
+        const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/");
+        const { exp } = JSON.parse(atob(payload));
+        return typeof exp === "number" ? exp * 1000 : null;
+    } catch {
+        return null;
+    }
+};
+
+const requestRefresh = async (): Promise<boolean> => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (!refreshToken) return false;
+
+    try {
+        const response = await fetch(`${API_URL}/auth/refresh`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        if (response.status === 401) {
+            // Sesión revocada o caducada: hay que volver a entrar
+            clearTokens();
+            return false;
+        }
+        if (!response.ok) return false;
+        saveTokens(await response.json());
+        return true;
+    } catch (error) {
+        console.error("Error refreshing token:", error);
+        return false;
+    }
+};
+
+let refreshing: Promise<boolean> | null = null;
+
+// Pedir un access token nuevo con el refresh token (que también se renueva).
+// Solo una petición a la vez: presentar dos veces el mismo refresh token
+// cuenta como reutilización y el backend revoca la sesión entera.
+export const refreshTokens = (): Promise<boolean> => {
+    if (!refreshing) {
+        refreshing = requestRefresh().finally(() => {
+            refreshing = null;
+        });
+    }
+    return refreshing;
+};
+
+// fetch con el access token; si el backend responde 401 se renueva una vez y se reintenta
+export const apiFetch = async (path: string, init: RequestInit = {}): Promise<Response> => {
+    const send = () => {
+        const headers = new Headers(init.headers);
+        if (!headers.has("Content-Type")) headers.set("Content-Type", "application/json");
+        const token = getAccessToken();
+        if (token) headers.set("Authorization", `Bearer ${token}`);
+        return fetch(`${API_URL}${path}`, { ...init, headers });
+    };
+
+    const response = await send();
+    if (response.status !== 401 || !(await refreshTokens())) return response;
+    return send();
+};
+
+const STREAM_ACTIONS = ["created", "updated", "deleted", "toggled"];
+const STREAM_RETRY_MS = 5000;
+
+// Canal de cambios (GET /sync/stream): llama a onChange con cada cambio del
+// recurso y con los `resync`. EventSource no puede enviar la cabecera
+// Authorization, así que se abre con un token corto de /sync/stream-token; si
+// el backend corta el canal (`expired`, al caducar o cerrarse la sesión) o se
+// cae la conexión, se pide otro token y se vuelve a conectar.
+// Devuelve la función que cierra el canal.
+export const openChangeStream = (resource: "task" | "habit", onChange: () => void) => {
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const reconnect = (delay: number) => {
+        source?.close();
+        source = null;
+        if (!closed) retry = setTimeout(connect, delay);
+    };
+
+    const connect = async () => {
+        try {
+            const response = await apiFetch("/sync/stream-token", { method: "POST" });
+            // 401 tras intentar renovar: la sesión se ha cerrado
+            if (response.status === 401) return;
+            if (!response.ok) return reconnect(STREAM_RETRY_MS);
+            const { stream_token } = await response.json();
+            if (closed) return;
+
+            source = new EventSource(`${API_URL}/sync/stream?token=${encodeURIComponent(stream_token)}`);
+            STREAM_ACTIONS.forEach((action) => source!.addEventListener(`${resource}.${action}`, onChange));
+            source.addEventListener("resync", onChange);
+            source.addEventListener("expired", () => reconnect(0));
+            source.onerror = () => reconnect(STREAM_RETRY_MS);
+        } catch {
+            reconnect(STREAM_RETRY_MS);
+        }
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        clearTimeout(retry);
+        source?.close();
+    };
+};